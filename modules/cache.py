@@ -0,0 +1,87 @@
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+import pandas as pd
+
+from modules import storage
+
+# Every session used to keep its own copy of the availability table in
+# session state, reloaded whenever that session wrote to it. The loaders here
+# share one copy per process instead. Each cached result is kept until the
+# version of its source changes, so a write by any session or process is
+# seen on the next rerun, and every caller gets a shallow copy: with pandas'
+# copy-on-write, changing it never changes the cached DataFrame.
+
+# results kept per loader, for different arguments, least recently used first
+CACHE_SIZE = 32
+
+
+def file_version(path):
+    """Returns a value that changes whenever the file at `path` is written."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def store_version():
+    """Returns a value that changes whenever the database is written.
+
+    Writes by this process are counted; writes by other processes change the
+    modification time or size of the database or its WAL file.
+    """
+    return storage.writes(), file_version(storage.DB_PATH), file_version(storage.DB_PATH + "-wal")
+
+
+def cached(version):
+    """Caches a DataFrame loader's results by its arguments until `version()` changes."""
+    def decorator(load):
+        entries = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(load)
+        def wrapper(*args, **kwargs):
+            current = version()
+            key = (args, tuple(sorted(kwargs.items())))
+            with lock:
+                if key in entries and entries[key][0] == current:
+                    entries.move_to_end(key)
+                    return entries[key][1].copy(deep=False)
+
+            df = load(*args, **kwargs)
+            with lock:
+                # results of older versions are never returned again
+                for stale in [k for k, (v, _) in entries.items() if v != current]:
+                    del entries[stale]
+                entries[key] = current, df
+                while len(entries) > CACHE_SIZE:
+                    entries.popitem(last=False)
+            return df.copy(deep=False)
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
+
+
+load_availability = cached(store_version)(storage.load_availability)
+load_assignments = cached(store_version)(storage.load_assignments)
+load_performance = cached(store_version)(storage.load_performance)
+load_weeks = cached(store_version)(storage.load_weeks)
+load_weekly_hours = cached(store_version)(storage.load_weekly_hours)
+
+
+@cached(store_version)
+def load_availability_grid():
+    """Loads the open slots of every day and shift as a day x shift table.
+
+    There is a row for each day from the first to the last, in order, and the
+    shifts are in the order they first appear. Missing slots are NaN.
+    """
+    days_df = storage.load_availability()
+    grid = days_df.pivot(index='Day', columns='Shift', values='Available')
+    if grid.empty:
+        return grid
+    return grid.reindex(index=pd.date_range(grid.index.min(), grid.index.max()), columns=days_df['Shift'].unique())
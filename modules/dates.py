@@ -0,0 +1,73 @@
+import pandas as pd
+
+# Dates stay typed everywhere: datetime64 in DataFrames and whole days since
+# 1970-01-01 in the database. Strings only appear where a date is read from a
+# file or shown to a user.
+
+# roster keys and the app's own CSV files
+KEY_FORMAT = '%Y-%m-%d'
+# dates shown to users and in the manager's CSV template
+DISPLAY_FORMAT = '%d/%m/%Y'
+# shift start and end times, seconds are accepted when reading
+TIME_FORMATS = ['%H:%M', '%H:%M:%S']
+
+EPOCH = pd.Timestamp('1970-01-01')
+
+
+def parse_dates(values):
+    """Parses a column of dates to normalised datetime64, with NaT for anything unparseable.
+
+    Accepts datetimes, KEY_FORMAT strings and DISPLAY_FORMAT strings, so
+    day-first dates are never mistaken for month-first ones.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.normalize()
+    parsed = pd.to_datetime(values, format=KEY_FORMAT, errors='coerce')
+    return parsed.fillna(pd.to_datetime(values, format=DISPLAY_FORMAT, errors='coerce')).dt.normalize()
+
+
+def day_ordinals(values):
+    """Converts a column of dates to whole days since 1970-01-01, with <NA> for unparseable dates."""
+    return ((parse_dates(values) - EPOCH).dt.days).astype('Int64')
+
+
+def day_ordinal(value):
+    """Converts one date, datetime or KEY_FORMAT string to whole days since 1970-01-01."""
+    return (pd.Timestamp(value).normalize() - EPOCH).days
+
+
+def week_ordinal(day):
+    """Returns the ordinal of the Monday starting the ISO week of day ordinal `day`.
+
+    Works on single ordinals and on Series of them. 1970-01-01 was a Thursday.
+    """
+    return day - (day + 3) % 7
+
+
+def from_ordinals(ordinals):
+    """Converts whole days since 1970-01-01 back to datetime64."""
+    return pd.to_datetime(pd.Series(ordinals, dtype='int64'), unit='D')
+
+
+def _minutes(values):
+    values = pd.Series(values, dtype=object)
+    times = pd.to_datetime(values, format=TIME_FORMATS[0], errors='coerce')
+    for time_format in TIME_FORMATS[1:]:
+        times = times.fillna(pd.to_datetime(values, format=time_format, errors='coerce'))
+    return times.dt.hour * 60 + times.dt.minute
+
+
+def shift_hours(starts, ends):
+    """Returns the length in hours of each shift from columns of 'H:MM' start and end times.
+
+    Shifts that end at or before their start end on the next day. Times that
+    cannot be parsed give NaN.
+    """
+    hours = (_minutes(ends) - _minutes(starts).to_numpy()) / 60
+    return hours.where(hours > 0, hours + 24)
+
+
+def format_date(value, date_format=DISPLAY_FORMAT):
+    """Formats one date for display."""
+    return pd.Timestamp(value).strftime(date_format)
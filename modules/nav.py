@@ -39,13 +39,11 @@ def MenuButtons(user_roles=None):
     if ss["authentication_status"]:
 
         # (1) Only the admin role can access page 1 and other pages.
-        # In a user roles get all the usernames with admin role.
-        admins = [k for k, v in user_roles.items() if v == 'admin']
-        manager = [k for k, v in user_roles.items() if v == 'manager']
-        employee = [k for k, v in user_roles.items() if v == 'employee']
+        # Look up the role of the username that logged in.
+        role = user_roles.get(ss.username)
 
         # Show page 1 if the username that logged in is an admin.
-        if ss.username in admins:
+        if role == 'admin':
             Page1Nav() #employee
             Page2Nav() #manager
             Page5Nav() #analysis
@@ -54,20 +52,11 @@ def MenuButtons(user_roles=None):
             # Page6Nav() #test
 
         # (2) users with user and admin roles have access to page 2.
-        if ss.username in manager:
+        if role == 'manager':
             Page2Nav() #manager
             Page5Nav() #analysis
             Page4Nav() #roster generator
 
             
-        if ss.username in employee:
+        if role == 'employee':
             Page1Nav() #employee
-            
-
-            
-
-
-
-
-
-
@@ -0,0 +1,41 @@
+import os
+import threading
+from types import MappingProxyType
+
+import yaml
+from yaml.loader import SafeLoader
+
+CONFIG_FILENAME = 'config.yaml'
+
+# Every page render needs the logged in user's role. The config is parsed
+# once into a username -> role index, which is only rebuilt when the file's
+# modification time or size changes.
+_index = (None, MappingProxyType({}))
+_index_lock = threading.Lock()
+
+
+def _config_version():
+    try:
+        stat = os.stat(CONFIG_FILENAME)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_roles():
+    with open(CONFIG_FILENAME) as file:
+        config = yaml.load(file, Loader=SafeLoader)
+
+    usernames = config['credentials']['usernames'] if config is not None else {}
+    return MappingProxyType({username: user_info['role'] for username, user_info in usernames.items() if 'role' in user_info})
+
+
+def get_roles():
+    """Returns a read-only mapping of each username to its role, reloaded when the config changes."""
+    global _index
+    version = _config_version()
+    if _index[0] != version:
+        with _index_lock:
+            if _index[0] != version:
+                _index = (version, _load_roles())
+    return _index[1]
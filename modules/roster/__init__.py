@@ -0,0 +1,11 @@
+from modules.roster.api import MODES, build_roster, roster_from_workbook
+from modules.roster.batch import find_workbooks, infer_business_type, roster_site, run_batch
+from modules.roster.calendar import Calendar, build_calendar
+from modules.roster.demand import DEMAND_POLICIES, arrivals_departures_uplift, tiered_uplift, weekend_holiday_uplift
+from modules.roster.engine import calculate_shift_hours, generate_roster
+from modules.roster.files import evict_uploads, save_uploaded_file, touch_upload
+from modules.roster.incremental import reroster
+from modules.roster.output import OUTPUT_FORMATS, hours_rows, roster_rows, roster_tables, write_outputs, write_roster_csv, write_roster_excel
+from modules.roster.search import score_roster, search_roster
+from modules.roster.solver import optimise_roster
+from modules.roster.workbook import SHEET_NAMES, build_inputs, read_workbook, shift_times, validate_sheets
@@ -0,0 +1,98 @@
+"""Generates rosters from roster workbooks without the Streamlit app.
+
+    python -m modules.roster data/hotel_uploaded_file.xlsx --business-type Hotel --out rosters
+    python -m modules.roster sites/ --out rosters --workers 8
+
+Folders are searched for workbooks, and each workbook is rostered as its own
+site in a pool of worker processes. Unless --business-type is given, the
+business type comes from the folder or file name (hotel, fnb, retail,
+other). A summary.csv with one row per site is written next to the rosters.
+"""
+import argparse
+import logging
+import os
+import sys
+from functools import partial
+
+from modules.roster.api import MODES
+from modules.roster.batch import find_workbooks, infer_business_type, run_batch
+from modules.roster.demand import DEMAND_POLICIES, TIER_BASES, check_tiers, tiered_uplift
+from modules.roster.output import OUTPUT_FORMATS
+
+
+def parse_tiers(value):
+    """Parses "threshold:extra,..." into (threshold, extra) pairs."""
+    try:
+        return [(float(threshold), int(extra)) for threshold, extra in (tier.split(":") for tier in value.split(","))]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected threshold:extra pairs such as 0.8:1,0.9:2, got {value!r}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m modules.roster", description="Generate rosters from roster workbooks.")
+    parser.add_argument("paths", nargs="+", help="roster workbooks, or folders of them")
+    parser.add_argument("--business-type", choices=list(DEMAND_POLICIES), help="business type of every workbook (default: taken from the file name)")
+    parser.add_argument("--mode", choices=MODES, default="quick", help="roster mode (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="seed for reproducible rosters")
+    parser.add_argument("--seeds", type=int, default=16, help="rosters to try in best-of-n mode (default: %(default)s)")
+    parser.add_argument("--time-limit", type=float, default=10, help="solver time limit in seconds in optimise mode (default: %(default)s)")
+    parser.add_argument("--demand-tiers", type=parse_tiers, help="extra employees by demand instead of the business type's rule, e.g. 0.85:1,0.9:2,0.95:3, or 85:1,90:2,95:3 with --tier-basis percentile")
+    parser.add_argument("--tier-basis", choices=TIER_BASES, default="ratio", help="whether tier thresholds are fractions of the busiest date or percentiles (default: %(default)s)")
+    parser.add_argument("--demand-columns", type=lambda value: value.split(","), help="Day Information columns summed into demand by --demand-tiers, e.g. Covers,Footfall (default: all of them)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="xlsx", help="output format (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("--out", default="rosters", help="output directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    if args.demand_columns and not args.demand_tiers:
+        parser.error("--demand-columns needs --demand-tiers")
+    if args.demand_tiers:
+        try:
+            check_tiers(args.demand_tiers, args.tier_basis)
+        except ValueError as e:
+            parser.error(f"--demand-tiers: {e}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+
+    sites, site_names = [], set()
+    for path in args.paths:
+        if os.path.isdir(path):
+            found = find_workbooks(path)
+        else:
+            found = [(os.path.splitext(os.path.basename(path))[0], path)]
+        for site, workbook in found:
+            # e.g. marina.xlsx in two folders given as separate paths, whose outputs would overwrite each other
+            unique_site, n = site, 1
+            while unique_site in site_names:
+                n += 1
+                unique_site = f"{site}_{n}"
+            site_names.add(unique_site)
+            sites.append((unique_site, workbook, args.business_type or infer_business_type(workbook)))
+
+    if not sites:
+        logging.error("No workbooks found")
+        return 1
+
+    def report(done, total, row):
+        if row["Status"] == "ok":
+            logging.info("[%d/%d] %s rostered in %.2fs", done, total, row["Site"], row["Seconds"])
+        else:
+            logging.error("[%d/%d] %s failed after %.2fs: %s", done, total, row["Site"], row["Seconds"], row["Error"])
+
+    demand_policy = None
+    if args.demand_tiers:
+        demand_policy = partial(tiered_uplift, tiers=args.demand_tiers, basis=args.tier_basis, columns=args.demand_columns)
+
+    summary_df = run_batch(sites, args.out, mode=args.mode, output_format=args.format, max_workers=args.workers, progress=report, demand_policy=demand_policy, seed=args.seed, n_seeds=args.seeds, time_limit=args.time_limit)
+
+    failed = (summary_df["Status"] != "ok").sum()
+    logging.info("Rostered %d of %d sites in %.2fs of worker time, summary in %s", len(summary_df) - failed, len(summary_df), summary_df["Seconds"].sum(), os.path.join(args.out, "summary.csv"))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
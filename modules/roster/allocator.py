@@ -0,0 +1,49 @@
+import heapq
+
+
+class HoursQueue:
+    """Min-heap of employee ids keyed on the hours they have worked so far.
+
+    `hours` is shared with the caller. Whenever an employee's hours change
+    the caller pushes them again; the older heap entry is then stale and
+    skipped when it surfaces. Ties are broken randomly so that employees
+    with equal hours are not always picked in the same order.
+    """
+
+    def __init__(self, employee_ids, hours, rng):
+        self._hours = hours
+        self._rng = rng
+        self._version = {emp: 0 for emp in employee_ids}
+        self._heap = [(hours[emp], rng.random(), 0, emp) for emp in employee_ids]
+        heapq.heapify(self._heap)
+
+    def push(self, emp):
+        self._version[emp] += 1
+        heapq.heappush(self._heap, (self._hours[emp], self._rng.random(), self._version[emp], emp))
+
+    def take(self, count, is_eligible, hours_limit):
+        """Pops up to `count` eligible employees with the fewest hours.
+
+        Employees with more than `hours_limit` hours are never taken, and
+        since the heap is ordered by hours the search stops at the first one.
+        Popped employees that are not eligible are put back.
+        """
+        taken = []
+        skipped = []
+        while self._heap and len(taken) < count:
+            entry = self._heap[0]
+            hours, _, version, emp = entry
+            if version != self._version[emp]:
+                heapq.heappop(self._heap)  # stale entry
+                continue
+            if hours > hours_limit:
+                break
+            heapq.heappop(self._heap)
+            if is_eligible(emp):
+                taken.append(emp)
+            else:
+                skipped.append(entry)
+
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return taken
@@ -0,0 +1,31 @@
+from modules.roster.engine import generate_roster
+from modules.roster.search import search_roster
+from modules.roster.solver import optimise_roster
+from modules.roster.workbook import build_inputs, read_workbook
+
+MODES = ["quick", "best-of-n", "optimise"]
+
+
+def build_roster(inputs, mode="quick", seed=None, n_seeds=16, time_limit=10, max_workers=None):
+    """Builds a roster from `build_inputs` output with one of the MODES.
+
+    `max_workers` caps the processes used by best-of-n mode.
+    """
+    if mode == "quick":
+        return generate_roster(**inputs, seed=seed)
+    if mode == "best-of-n":
+        return search_roster(**inputs, n_seeds=n_seeds, base_seed=seed or 0, max_workers=max_workers)
+    if mode == "optimise":
+        return optimise_roster(**inputs, seed=seed, time_limit=time_limit)
+    raise ValueError(f"Unknown roster mode {mode!r}, expected one of {MODES}")
+
+
+def roster_from_workbook(path, business_type, mode="quick", demand_policy=None, **options):
+    """Reads a roster workbook and builds its roster without Streamlit.
+
+    Returns the roster, the total hours per employee and the sheets that
+    were read.
+    """
+    sheets = read_workbook(path)
+    roster, total_hours = build_roster(build_inputs(sheets, business_type, demand_policy), mode=mode, **options)
+    return roster, total_hours, sheets
@@ -0,0 +1,32 @@
+import numpy as np
+
+# Employees are referred to by their position in the employee list so that
+# eligibility checks are boolean masks over integer ids instead of list scans.
+STATUS_TIERS = ["Manager", "Full-time", "Part-time"]
+
+
+def build_status_masks(employees, employee_status):
+    """Returns one boolean mask over employee ids per status in STATUS_TIERS."""
+    statuses = np.array([employee_status.get(emp) for emp in employees], dtype=object)
+    return {status: statuses == status for status in STATUS_TIERS}
+
+
+def build_availability(employees, dates, shifts, off_days):
+    """Builds the employee x date x shift eligibility matrix.
+
+    An entry is False when the employee has the date off. Off days naming an
+    unknown employee or date are ignored.
+    """
+    available = np.ones((len(employees), len(dates), len(shifts)), dtype=bool)
+
+    employee_ids = {emp: i for i, emp in enumerate(employees)}
+    date_ids = {date: i for i, date in enumerate(dates)}
+
+    off_pairs = [(employee_ids[emp], date_ids[date])
+                 for date, off_employees in off_days.items() if date in date_ids
+                 for emp in off_employees if emp in employee_ids]
+    if off_pairs:
+        emp_idx, date_idx = np.array(off_pairs).T
+        available[emp_idx, date_idx, :] = False
+
+    return available
@@ -0,0 +1,111 @@
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from modules.roster.api import build_roster
+from modules.roster.output import write_outputs
+from modules.roster.search import score_roster
+from modules.roster.workbook import build_inputs, read_workbook
+
+# Words in a workbook's file or folder name that give away its business type
+BUSINESS_TYPE_ALIASES = {
+    'hotel': 'Hotel',
+    'fnb': 'FnB',
+    'retail': 'Retail',
+    'other': 'Others',
+    'others': 'Others',
+}
+
+SUMMARY_COLUMNS = ["Site", "Business Type", "Status", "Seconds", "Dates", "Employees", "Coverage Shortfall", "Shifts Without Manager", "Total Hours", "Outputs", "Error"]
+
+
+def infer_business_type(path):
+    """Guesses the business type from the folder and file name, e.g. `hotel/marina.xlsx` or `marina_hotel.xlsx`."""
+    parent = os.path.basename(os.path.dirname(path))
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for word in re.split(r"[\W_]+", f"{parent} {stem}".lower()):
+        if word in BUSINESS_TYPE_ALIASES:
+            return BUSINESS_TYPE_ALIASES[word]
+    return None
+
+
+def find_workbooks(directory):
+    """Returns the `.xlsx` workbooks under `directory` as (site, path) pairs.
+
+    The site name is the path relative to `directory` without the extension,
+    with folders joined by "__" so it can be used as a file name.
+    """
+    sites = []
+    for root, _, files in os.walk(directory):
+        for file_name in sorted(files):
+            if file_name.endswith(".xlsx") and not file_name.startswith("~$"):
+                path = os.path.join(root, file_name)
+                site = os.path.splitext(os.path.relpath(path, directory))[0].replace(os.sep, "__")
+                sites.append((site, path))
+    return sorted(sites)
+
+
+def roster_site(site, path, business_type, out_dir, mode="quick", output_format="xlsx", demand_policy=None, **options):
+    """Rosters one site and writes its outputs, returning its summary row.
+
+    Errors are reported in the row rather than raised so one bad workbook
+    does not stop a batch.
+    """
+    started = time.perf_counter()
+    summary = dict.fromkeys(SUMMARY_COLUMNS)
+    summary.update({"Site": site, "Business Type": business_type})
+    try:
+        if business_type is None:
+            raise ValueError("could not tell the business type from the file name")
+        inputs = build_inputs(read_workbook(path), business_type, demand_policy)
+        roster, total_hours = build_roster(inputs, mode=mode, **options)
+        outputs = write_outputs(roster, total_hours, out_dir, site, output_format=output_format)
+        _, components = score_roster(roster, total_hours, inputs['employee_status'], inputs['shifts'], inputs['dates'], inputs['min_employees_per_shift'], inputs['max_employees_per_day'], inputs['min_hours'], inputs['demand_uplift'])
+        summary.update({
+            "Status": "ok",
+            "Dates": len(inputs['dates']),
+            "Employees": len(inputs['employees']),
+            "Coverage Shortfall": components['coverage_shortfall'],
+            "Shifts Without Manager": components['shifts_without_manager'],
+            "Total Hours": round(sum(total_hours.values()), 2),
+            "Outputs": ", ".join(outputs),
+        })
+    except Exception as e:
+        summary.update({"Status": "error", "Error": f"{type(e).__name__}: {e}"})
+    summary["Seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def run_batch(sites, out_dir, mode="quick", output_format="xlsx", max_workers=None, progress=None, **options):
+    """Rosters many sites across a process pool.
+
+    `sites` holds (site, path, business_type) tuples. Each site's roster is
+    written to `out_dir`, followed by `summary.csv` with one row per site.
+    `progress` is called with (done, total, summary row) as sites finish.
+    Returns the summary as a DataFrame in `sites` order.
+
+    Site names are used as output file names, so they must be unique.
+    """
+    duplicates = sorted(site for site, count in Counter(site for site, _, _ in sites).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"site names must be unique, found {', '.join(duplicates)} more than once")
+    os.makedirs(out_dir, exist_ok=True)
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(sites), 1))
+    # the sites already use every worker, so best-of-n runs its seeds in-process
+    options.setdefault("max_workers", 1)
+
+    rows = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(roster_site, site, path, business_type, out_dir, mode, output_format, **options): i for i, (site, path, business_type) in enumerate(sites)}
+        for future in as_completed(futures):
+            rows[futures[future]] = future.result()
+            if progress is not None:
+                progress(len(rows), len(sites), rows[futures[future]])
+
+    summary_df = pd.DataFrame([rows[i] for i in range(len(sites))], columns=SUMMARY_COLUMNS)
+    summary_df.to_csv(os.path.join(out_dir, "summary.csv"), index=False)
+    return summary_df
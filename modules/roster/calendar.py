@@ -0,0 +1,36 @@
+from typing import NamedTuple
+
+import numpy as np
+
+from modules.dates import parse_dates
+
+# Day Information columns that count customers and can drive demand policies
+DEMAND_COLUMNS = ["Arrivals", "Departures", "Covers", "Footfall"]
+
+
+class Calendar(NamedTuple):
+    """The roster dates, parsed once per run and indexed by date position."""
+    dates: list  # normalised Timestamps used as roster and off day keys
+    weekday: np.ndarray  # 0=Monday ... 6=Sunday
+    holiday: np.ndarray  # True on holidays
+    demand: dict  # demand column name -> float array, for the DEMAND_COLUMNS in the sheet
+
+
+def build_calendar(day_df):
+    """Builds the calendar index from the "Day Information" sheet in one pass."""
+    days = parse_dates(day_df['Date'])
+
+    if 'Holiday' in day_df:
+        holidays = parse_dates(day_df['Holiday']).dropna()
+        holiday = days.isin(holidays).to_numpy()
+    else:
+        holiday = np.zeros(len(days), dtype=bool)
+
+    demand = {column: day_df[column].fillna(0).to_numpy(dtype=float) for column in DEMAND_COLUMNS if column in day_df}
+
+    return Calendar(
+        dates=days.tolist(),
+        weekday=days.dt.weekday.to_numpy(),
+        holiday=holiday,
+        demand=demand,
+    )
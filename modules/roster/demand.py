@@ -0,0 +1,68 @@
+from functools import partial
+
+import numpy as np
+
+# Demand policies turn the calendar index into the number of extra employees
+# each shift needs, as an array aligned with the calendar's dates. They run
+# once per roster, before any shift is assigned.
+
+# (threshold, extra employees) pairs. With the "ratio" basis a threshold is a
+# fraction of the busiest date's demand; with the "percentile" basis it is a
+# percentile of demand over the roster's dates. A date gets the extra
+# employees of the highest threshold its demand is above.
+HOTEL_TIERS = [(0.75, 1), (0.80, 2), (0.85, 3)]
+TIER_BASES = ["ratio", "percentile"]
+
+
+def demand_totals(calendar, columns=None):
+    """Sums the given demand columns, or all of the calendar's, per date."""
+    columns = list(calendar.demand) if columns is None else columns
+    missing = [column for column in columns if column not in calendar.demand]
+    if missing:
+        raise ValueError(f"Day Information is missing the demand column(s) {', '.join(missing)}")
+    return np.sum([calendar.demand[column] for column in columns], axis=0) if columns else np.zeros(len(calendar.dates))
+
+
+def check_tiers(tiers, basis="ratio"):
+    """Raises ValueError unless every threshold of `tiers` is in range for `basis`."""
+    if basis not in TIER_BASES:
+        raise ValueError(f"Unknown tier basis {basis!r}, expected one of {TIER_BASES}")
+    low, high = (0, 1) if basis == "ratio" else (0, 100)
+    out_of_range = [threshold for threshold, _ in tiers if not low <= threshold <= high]
+    if out_of_range:
+        raise ValueError(f"{basis} tier thresholds must be between {low} and {high}, got {', '.join(map(str, out_of_range))}")
+
+
+def tiered_uplift(calendar, tiers, basis="ratio", columns=None):
+    """Adds employees on busy dates according to `tiers` (see HOTEL_TIERS)."""
+    check_tiers(tiers, basis)
+    demand = demand_totals(calendar, columns)
+    thresholds, extras = zip(*sorted(tiers)) if tiers else ((), ())
+    thresholds = np.array(thresholds, dtype=float)
+
+    if basis == "ratio":
+        busiest = demand.max() if len(demand) else 0
+        level = demand / busiest if busiest > 0 else np.zeros(len(demand))
+        cutoffs = thresholds
+    else:
+        level = demand
+        cutoffs = np.percentile(demand, thresholds) if len(demand) and len(thresholds) else thresholds
+
+    # number of thresholds each date is above, i.e. the index of its tier
+    tier = (level[:, None] > cutoffs[None, :]).sum(axis=1)
+    return np.array((0,) + extras, dtype=int)[tier]
+
+
+def weekend_holiday_uplift(calendar):
+    # add an extra employee on weekends (5=Saturday, 6=Sunday) and another on holidays
+    return (calendar.weekday >= 5).astype(int) + calendar.holiday.astype(int)
+
+
+arrivals_departures_uplift = partial(tiered_uplift, tiers=HOTEL_TIERS, basis="ratio", columns=["Arrivals", "Departures"])
+
+DEMAND_POLICIES = {
+    'Hotel': arrivals_departures_uplift,
+    'FnB': weekend_holiday_uplift,
+    'Retail': weekend_holiday_uplift,
+    'Others': weekend_holiday_uplift,
+}
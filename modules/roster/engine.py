@@ -0,0 +1,113 @@
+import logging
+import random
+from datetime import timedelta, datetime
+
+import numpy as np
+
+from modules.roster.allocator import HoursQueue
+from modules.roster.availability import build_availability, build_status_masks
+
+logger = logging.getLogger(__name__)
+
+
+def calculate_shift_hours(start_time, end_time):
+    now = datetime.now()
+
+    # Combine current date with time for start and end
+    start = datetime.combine(now, start_time)
+    end = datetime.combine(now, end_time)
+
+    if end < start:
+        end += timedelta(days=1)  # handles overnight shifts
+
+    return (end - start).total_seconds() / 3600
+
+
+def build_queues(employees, employee_status, hours, rng):
+    """Returns one HoursQueue per status, and the queue each employee id belongs to."""
+    queues = {}
+    queue_of = {}
+    for status, mask in build_status_masks(employees, employee_status).items():
+        employee_ids = np.flatnonzero(mask).tolist()
+        queues[status] = HoursQueue(employee_ids, hours, rng)
+        queue_of.update(dict.fromkeys(employee_ids, queues[status]))
+    return queues, queue_of
+
+
+def required_employees(date, shift, uplift, min_employees_per_shift, max_employees_per_day):
+    num_employees = min_employees_per_shift[shift] + uplift
+
+    if num_employees > max_employees_per_day:
+        logger.warning("Exceeding maximum number of employees for %s. Adjusting...", date)
+        num_employees = max_employees_per_day
+    return num_employees
+
+
+def pick_employees(queues, num_employees, is_eligible, hours_limit, need_manager=True):
+    """Takes the employees with the fewest hours for a shift, by status tier."""
+    # Assign managers first to each shift evenly
+    assigned_managers = queues["Manager"].take(1 if need_manager else 0, is_eligible, hours_limit)  # ensure at least one manager per shift
+    remaining_slots = num_employees - len(assigned_managers)
+
+    # Assign full-time employees after managers, then part-time employees if there are still remaining slots
+    assigned = queues["Full-time"].take(remaining_slots, is_eligible, hours_limit)
+    remaining_slots -= len(assigned)
+    assigned.extend(assigned_managers)
+    assigned.extend(queues["Part-time"].take(remaining_slots, is_eligible, hours_limit))
+    return assigned
+
+
+def generate_roster(employees, employee_status, shifts, dates, shift_hours, min_employees_per_shift, max_employees_per_day, min_hours, max_hours, off_days, demand_uplift, seed=None):
+    """Greedily assigns employees to every shift of every date.
+
+    `demand_uplift` holds the number of extra employees added to each shift,
+    aligned with `dates` (see `modules.roster.demand`). Within each status
+    the employees with the fewest hours so far are picked first; `seed` fixes
+    how ties are broken.
+    """
+    rng = random.Random(seed)
+    available = build_availability(employees, dates, shifts, off_days)
+
+    hours = [0.0] * len(employees)
+    queues, queue_of = build_queues(employees, employee_status, hours, rng)
+
+    roster = {date: {shift: [] for shift in shifts} for date in dates}
+
+    for d, date in enumerate(dates):
+        # employees already working a shift on this date
+        free_today = [True] * len(employees)
+        assigned_ids = {}
+
+        for s, shift in enumerate(shifts):
+            num_employees = required_employees(date, shift, demand_uplift[d], min_employees_per_shift, max_employees_per_day)
+
+            def is_eligible(emp):
+                return free_today[emp] and available[emp, d, s]
+
+            assigned = pick_employees(queues, num_employees, is_eligible, max_hours - shift_hours[shift])
+            for emp in assigned:
+                hours[emp] += shift_hours[shift]
+                free_today[emp] = False
+                queue_of[emp].push(emp)
+            assigned_ids[shift] = assigned
+
+        trim_to_daily_max(assigned_ids, shifts, hours, queue_of, shift_hours, min_employees_per_shift, max_employees_per_day)
+
+        for shift, ids in assigned_ids.items():
+            roster[date][shift] = [employees[i] for i in ids]
+
+    total_hours = dict(zip(employees, hours))
+    return roster, total_hours
+
+
+def trim_to_daily_max(assigned_ids, shifts, hours, queue_of, shift_hours, min_employees_per_shift, max_employees_per_day):
+    # Ensure total number of employees per day does not exceed max_employees_per_day
+    excess = sum(len(ids) for ids in assigned_ids.values()) - max_employees_per_day
+    for shift in shifts:
+        if excess <= 0:
+            break
+        while len(assigned_ids[shift]) > min_employees_per_shift[shift] and excess > 0:
+            emp = assigned_ids[shift].pop()
+            hours[emp] -= shift_hours[shift]
+            queue_of[emp].push(emp)
+            excess -= 1
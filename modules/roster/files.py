@@ -0,0 +1,59 @@
+import hashlib
+import os
+import threading
+
+# Uploads are stored under their content hash, so identical uploads share one
+# file and sessions never write to a path another session is reading.
+UPLOAD_DIR = os.path.join("data", "uploads")
+
+# uploads kept on disk, the least recently used are removed first
+UPLOAD_CACHE_SIZE = 64
+
+_upload_lock = threading.Lock()
+
+
+def save_uploaded_file(uploaded_file, suffix=".xlsx"):
+    """Stores an uploaded file under its content hash and returns its path.
+
+    The file is only written the first time its content is uploaded.
+    """
+    data = uploaded_file.getbuffer()
+    file_path = os.path.join(UPLOAD_DIR, hashlib.sha256(data).hexdigest() + suffix)
+    with _upload_lock:
+        os.makedirs(UPLOAD_DIR, exist_ok=True)
+        if not touch_upload(file_path):
+            # write then rename, so other processes never read a partial file
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+        evict_uploads(keep=file_path)
+    return file_path
+
+
+def touch_upload(file_path):
+    """Marks an upload as recently used. Returns False if it has been evicted."""
+    try:
+        os.utime(file_path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def evict_uploads(keep=None, max_files=None):
+    """Removes the least recently used uploads beyond `max_files`, never `keep`."""
+    max_files = UPLOAD_CACHE_SIZE if max_files is None else max_files
+    uploads = []
+    for entry in os.scandir(UPLOAD_DIR):
+        if entry.is_file() and not entry.name.endswith(".tmp") and entry.path != keep:
+            try:
+                uploads.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+
+    excess = len(uploads) + (keep is not None) - max_files
+    for _, file_path in sorted(uploads)[:max(excess, 0)]:
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,102 @@
+import random
+
+from modules.roster.engine import build_queues, pick_employees, required_employees, trim_to_daily_max
+
+
+def reroster(roster, total_hours, employees, employee_status, shifts, dates, shift_hours, min_employees_per_shift, max_employees_per_day, min_hours, max_hours, off_days, demand_uplift, changed_dates=(), changed_shifts=(), seed=None):
+    """Repairs a roster after a small change to its inputs.
+
+    The inputs are the updated ones. Only the shifts on `changed_dates` and
+    the `changed_shifts` on every date are looked at, e.g. the date of a new
+    off day or the shift whose min employees changed. Employees who can still
+    work a looked-at shift keep it; the shift is then topped up or trimmed to
+    the required number of employees. `total_hours` is carried forward rather
+    than recomputed from the whole roster.
+
+    Returns the new roster, the new total hours and the dates that changed.
+    """
+    rng = random.Random(seed)
+    employee_ids = {emp: i for i, emp in enumerate(employees)}
+    hours = [float(total_hours.get(emp, 0.0)) for emp in employees]
+    queues, queue_of = build_queues(employees, employee_status, hours, rng)
+
+    changed_dates = set(changed_dates)
+    changed_shifts = set(changed_shifts)
+    new_roster = dict(roster)
+    updated_dates = []
+
+    for d, date in enumerate(dates):
+        if date in changed_dates:
+            affected_shifts = list(shifts)
+        else:
+            affected_shifts = [shift for shift in shifts if shift in changed_shifts]
+        if not affected_shifts:
+            continue
+
+        previous = roster.get(date, {})
+        assigned_ids = {shift: [employee_ids[emp] for emp in previous.get(shift, []) if emp in employee_ids] for shift in shifts}
+        off_today = {employee_ids[emp] for emp in off_days.get(date, []) if emp in employee_ids}
+        working_today = {emp for shift in shifts if shift not in affected_shifts for emp in assigned_ids[shift]}
+
+        def release(emp, shift):
+            hours[emp] -= shift_hours[shift]
+            if emp in queue_of:
+                queue_of[emp].push(emp)
+
+        def is_manager(emp):
+            return employee_status.get(employees[emp]) == "Manager"
+
+        def pop_surplus(kept):
+            # the last employee who is not the shift's only manager goes first
+            managers = sum(is_manager(emp) for emp in kept)
+            for i in reversed(range(len(kept))):
+                if not (is_manager(kept[i]) and managers == 1):
+                    return kept.pop(i)
+            return kept.pop()
+
+        # drop employees who now have the day off or already work another shift
+        for shift in affected_shifts:
+            kept = []
+            for emp in assigned_ids[shift]:
+                if emp in off_today or emp in working_today:
+                    release(emp, shift)
+                else:
+                    kept.append(emp)
+                    working_today.add(emp)
+            assigned_ids[shift] = kept
+
+        for shift in affected_shifts:
+            kept = assigned_ids[shift]
+            num_employees = required_employees(date, shift, demand_uplift[d], min_employees_per_shift, max_employees_per_day)
+            while len(kept) > num_employees:
+                emp = pop_surplus(kept)
+                working_today.discard(emp)
+                release(emp, shift)
+
+            if len(kept) < num_employees:
+                def is_eligible(emp):
+                    return emp not in working_today and emp not in off_today
+
+                need_manager = not any(is_manager(emp) for emp in kept)
+                added = pick_employees(queues, num_employees - len(kept), is_eligible, max_hours - shift_hours[shift], need_manager=need_manager)
+                for emp in added:
+                    hours[emp] += shift_hours[shift]
+                    working_today.add(emp)
+                    queue_of[emp].push(emp)
+                kept.extend(added)
+
+            assigned_ids[shift] = kept
+
+        # only the shifts being repaired are trimmed to the daily maximum
+        trimmable = {shift: assigned_ids[shift] for shift in affected_shifts}
+        trimmable_max = max_employees_per_day - sum(len(assigned_ids[shift]) for shift in shifts if shift not in affected_shifts)
+        trim_to_daily_max(trimmable, affected_shifts, hours, queue_of, shift_hours, min_employees_per_shift, trimmable_max)
+
+        new_shifts = {shift: [employees[i] for i in assigned_ids[shift]] for shift in shifts}
+        if new_shifts != previous:
+            new_roster[date] = new_shifts
+            updated_dates.append(date)
+
+    new_total_hours = dict(total_hours)
+    new_total_hours.update(zip(employees, hours))
+    return new_roster, new_total_hours, updated_dates
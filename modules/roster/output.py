@@ -0,0 +1,79 @@
+import csv
+import os
+from itertools import chain
+
+import pandas as pd
+import xlsxwriter
+
+from modules.dates import KEY_FORMAT, format_date
+
+OUTPUT_FORMATS = ["xlsx", "csv"]
+
+
+def roster_tables(roster, total_hours):
+    """Returns the roster as a date x shift table and the hours per employee."""
+    rows = roster_rows(roster)
+    columns = next(rows)
+    roster_df = pd.DataFrame(rows, columns=columns)
+    hours_df = pd.DataFrame(hours_rows(total_hours), columns=['Employee', 'Hours'])
+    return roster_df, hours_df
+
+
+def roster_rows(roster):
+    """Yields the header and then one row per date of the date x shift roster table, with dates as KEY_FORMAT strings."""
+    shifts = list(next(iter(roster.values()), {}))
+    yield ["Date"] + shifts
+    for date, shifts_dict in roster.items():
+        yield [format_date(date, KEY_FORMAT)] + [', '.join(shifts_dict[shift]) for shift in shifts]
+
+
+def hours_rows(total_hours):
+    """Yields an (employee, hours) row per employee."""
+    for employee, hours in total_hours.items():
+        yield employee, round(hours, 2)
+
+
+def write_roster_excel(target, roster, total_hours):
+    """Writes the roster and hours tables to a file path or buffer as one workbook.
+
+    Rows are written as they are produced in xlsxwriter's constant memory
+    mode, so memory use does not grow with the size of the roster.
+    """
+    workbook = xlsxwriter.Workbook(target, {'constant_memory': True})
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+
+    roster_sheet = workbook.add_worksheet('Roster')
+    for r, row in enumerate(roster_rows(roster)):
+        roster_sheet.write_row(r, 0, row, header_format if r == 0 else None)
+
+    hours_sheet = workbook.add_worksheet('Total Hours')
+    hours_sheet.write_row(0, 0, ['Employee', 'Hours'], header_format)
+    for r, row in enumerate(hours_rows(total_hours), start=1):
+        hours_sheet.write_row(r, 0, row)
+
+    workbook.close()
+
+
+def write_roster_csv(target, rows):
+    """Writes rows to a CSV file path one at a time."""
+    with open(target, 'w', newline='') as f:
+        csv.writer(f).writerows(rows)
+
+
+def write_outputs(roster, total_hours, out_dir, name, output_format="xlsx"):
+    """Writes a roster to `out_dir` as `<name>.xlsx`, or as `<name>_roster.csv` and `<name>_hours.csv`.
+
+    Returns the paths written.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    if output_format == "xlsx":
+        path = os.path.join(out_dir, f"{name}.xlsx")
+        write_roster_excel(path, roster, total_hours)
+        return [path]
+
+    roster_path = os.path.join(out_dir, f"{name}_roster.csv")
+    hours_path = os.path.join(out_dir, f"{name}_hours.csv")
+    write_roster_csv(roster_path, roster_rows(roster))
+    write_roster_csv(hours_path, chain([('Employee', 'Hours')], hours_rows(total_hours)))
+    return [roster_path, hours_path]
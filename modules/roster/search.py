@@ -0,0 +1,75 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from modules.roster.engine import generate_roster
+
+# Weights of the score components; lower scores are better.
+SCORE_WEIGHTS = {
+    'coverage_shortfall': 1000,
+    'shifts_without_manager': 100,
+    'min_hours_shortfall': 1,
+    'hours_variance': 1,
+}
+
+
+def score_roster(roster, total_hours, employee_status, shifts, dates, min_employees_per_shift, max_employees_per_day, min_hours, demand_uplift):
+    """Scores a roster, returning the weighted total and its components."""
+    coverage_shortfall = 0
+    shifts_without_manager = 0
+    for d, date in enumerate(dates):
+        for shift in shifts:
+            assigned = roster[date][shift]
+            required = min(min_employees_per_shift[shift] + demand_uplift[d], max_employees_per_day)
+            coverage_shortfall += max(required - len(assigned), 0)
+            if not any(employee_status.get(emp) == "Manager" for emp in assigned):
+                shifts_without_manager += 1
+
+    hours = np.array(list(total_hours.values()), dtype=float)
+    components = {
+        'coverage_shortfall': coverage_shortfall,
+        'shifts_without_manager': shifts_without_manager,
+        'min_hours_shortfall': float(np.clip(min_hours - hours, 0, None).sum()) if len(hours) else 0.0,
+        'hours_variance': float(hours.var()) if len(hours) else 0.0,
+    }
+    score = sum(SCORE_WEIGHTS[name] * value for name, value in components.items())
+    return score, components
+
+
+# Roster inputs are sent to each worker process once, not with every seed
+_worker_inputs = None
+
+
+def _init_worker(inputs):
+    global _worker_inputs
+    _worker_inputs = inputs
+
+
+def _generate_and_score(seed):
+    employees, employee_status, shifts, dates, shift_hours, min_employees_per_shift, max_employees_per_day, min_hours, max_hours, off_days, demand_uplift = _worker_inputs
+    roster, total_hours = generate_roster(employees, employee_status, shifts, dates, shift_hours, min_employees_per_shift, max_employees_per_day, min_hours, max_hours, off_days, demand_uplift, seed=seed)
+    score, _ = score_roster(roster, total_hours, employee_status, shifts, dates, min_employees_per_shift, max_employees_per_day, min_hours, demand_uplift)
+    return score, seed, roster, total_hours
+
+
+def search_roster(employees, employee_status, shifts, dates, shift_hours, min_employees_per_shift, max_employees_per_day, min_hours, max_hours, off_days, demand_uplift, n_seeds=16, base_seed=0, max_workers=None):
+    """Generates rosters for seeds `base_seed` to `base_seed + n_seeds - 1` and returns the best.
+
+    The seeds are spread over a process pool using every core unless
+    `max_workers` says otherwise. The same inputs and seeds always give the
+    same roster; ties go to the lowest seed.
+    """
+    inputs = (employees, employee_status, shifts, dates, shift_hours, min_employees_per_shift, max_employees_per_day, min_hours, max_hours, off_days, demand_uplift)
+    seeds = range(base_seed, base_seed + n_seeds)
+    max_workers = min(max_workers or os.cpu_count() or 1, n_seeds)
+
+    if max_workers <= 1:
+        _init_worker(inputs)
+        results = [_generate_and_score(seed) for seed in seeds]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(inputs,)) as executor:
+            results = list(executor.map(_generate_and_score, seeds))
+
+    _, _, roster, total_hours = min(results, key=lambda result: result[:2])
+    return roster, total_hours
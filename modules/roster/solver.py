@@ -0,0 +1,116 @@
+import logging
+
+import numpy as np
+
+from modules.roster.availability import STATUS_TIERS, build_availability, build_status_masks
+from modules.roster.engine import generate_roster
+
+try:
+    from ortools.sat.python import cp_model
+except ImportError:  # optimise mode falls back to the greedy roster
+    cp_model = None
+
+logger = logging.getLogger(__name__)
+
+# Objective weights, all in minutes below the min hours since CP-SAT counts
+# hours in minutes: an unfilled slot costs as much as 1000 hours below the
+# minimum and a shift without a manager as much as 100 hours.
+COVERAGE_WEIGHT = 60000
+MANAGER_WEIGHT = 6000
+MIN_HOURS_WEIGHT = 1
+
+
+def optimise_roster(employees, employee_status, shifts, dates, shift_hours, min_employees_per_shift, max_employees_per_day, min_hours, max_hours, off_days, demand_uplift, seed=None, time_limit=10):
+    """Builds the roster with the CP-SAT solver from OR-Tools.
+
+    Off days, one shift per day, max hours and the daily head count are hard
+    constraints. Shift coverage, a manager on every shift and min hours are
+    soft, so the model always has a solution. The solver starts from the
+    greedy roster and runs for at most `time_limit` seconds. If OR-Tools is
+    not installed or no solution is found in time, the greedy roster is
+    returned.
+    """
+    greedy = generate_roster(employees, employee_status, shifts, dates, shift_hours, min_employees_per_shift, max_employees_per_day, min_hours, max_hours, off_days, demand_uplift, seed=seed)
+    if cp_model is None:
+        logger.warning("OR-Tools is not installed, using the greedy roster")
+        return greedy
+
+    greedy_roster, _ = greedy
+    available = build_availability(employees, dates, shifts, off_days)
+    status_masks = build_status_masks(employees, employee_status)
+    rostered = np.zeros(len(employees), dtype=bool)
+    for status in STATUS_TIERS:
+        rostered |= status_masks[status]
+    available &= rostered[:, None, None]
+
+    # CP-SAT only works with integers, so hours are counted in minutes
+    shift_minutes = [round(shift_hours[shift] * 60) for shift in shifts]
+    min_minutes = round(min_hours * 60)
+    max_minutes = round(max_hours * 60)
+
+    model = cp_model.CpModel()
+    assign = {(e, d, s): model.NewBoolVar(f"x_{e}_{d}_{s}") for e, d, s in zip(*np.nonzero(available))}
+    employee_ids = {emp: i for i, emp in enumerate(employees)}
+    for d, date in enumerate(dates):
+        for s, shift in enumerate(shifts):
+            for emp in greedy_roster[date][shift]:
+                model.AddHint(assign[employee_ids[emp], d, s], 1)
+
+    penalties = []
+
+    by_day = {}
+    by_slot = {}
+    by_employee_day = {}
+    by_employee = {}
+    for (e, d, s), var in assign.items():
+        by_day.setdefault(d, []).append(var)
+        by_slot.setdefault((d, s), []).append((e, var))
+        by_employee_day.setdefault((e, d), []).append(var)
+        by_employee.setdefault(e, []).append(var * shift_minutes[s])
+
+    for d, date in enumerate(dates):
+        for s, shift in enumerate(shifts):
+            required = min(min_employees_per_shift[shift] + demand_uplift[d], max_employees_per_day)
+            slot = by_slot.get((d, s), [])
+            staffed = sum(var for _, var in slot)
+            shortfall = model.NewIntVar(0, required, f"short_{d}_{s}")
+            model.Add(staffed + shortfall == required)
+            penalties.append(COVERAGE_WEIGHT * shortfall)
+
+            no_manager = model.NewBoolVar(f"no_manager_{d}_{s}")
+            model.Add(sum(var for e, var in slot if status_masks["Manager"][e]) + no_manager >= 1)
+            penalties.append(MANAGER_WEIGHT * no_manager)
+
+    for day_vars in by_day.values():
+        model.Add(sum(day_vars) <= max_employees_per_day)
+
+    for day_vars in by_employee_day.values():
+        model.AddAtMostOne(day_vars)
+
+    for e, worked in by_employee.items():
+        worked = sum(worked)
+        model.Add(worked <= max_minutes)
+        if min_minutes > 0:
+            below_min = model.NewIntVar(0, min_minutes, f"below_min_{e}")
+            model.Add(worked + below_min >= min_minutes)
+            penalties.append(MIN_HOURS_WEIGHT * below_min)
+
+    model.Minimize(sum(penalties))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    if seed is not None:
+        solver.parameters.random_seed = seed
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        logger.warning("No solution found in %s seconds, using the greedy roster", time_limit)
+        return greedy
+
+    roster = {date: {shift: [] for shift in shifts} for date in dates}
+    total_hours = {emp: 0.0 for emp in employees}
+    for (e, d, s), var in assign.items():
+        if solver.BooleanValue(var):
+            roster[dates[d]][shifts[s]].append(employees[e])
+            total_hours[employees[e]] += shift_hours[shifts[s]]
+
+    return roster, total_hours
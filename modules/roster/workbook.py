@@ -0,0 +1,149 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, time
+from io import BytesIO
+
+import pandas as pd
+
+from modules.dates import parse_dates
+from modules.roster.calendar import build_calendar
+from modules.roster.demand import DEMAND_POLICIES
+from modules.roster.engine import calculate_shift_hours
+
+SHEET_NAMES = ["Employee Information", "Shift Information", "Day Information", "Off Days", "General Information"]
+
+# Columns each sheet must have, and the type their values are converted to
+SHEET_COLUMNS = {
+    "Employee Information": {"Employee": "str", "Status": "str"},
+    "Shift Information": {"Shift": "str", "Start": "time", "End": "time", "Min Employees": "int"},
+    "Day Information": {"Date": "date"},
+    "Off Days": {"Employee": "str", "Date": "date"},
+    "General Information": {"Max Employees per Day": "int", "Min Hours per Employee": "float", "Max Hours per Employee": "float"},
+}
+
+# Parsed workbooks kept by content hash, least recently used first
+WORKBOOK_CACHE_SIZE = 16
+_workbook_cache = OrderedDict()
+_workbook_cache_lock = threading.Lock()
+
+
+def read_workbook(path):
+    """Reads and validates the five roster sheets of a workbook into DataFrames keyed by sheet name.
+
+    All sheets are parsed in one pass and cached by the file's content hash,
+    so reading an unchanged workbook again does not parse it again.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+
+    with _workbook_cache_lock:
+        if digest in _workbook_cache:
+            _workbook_cache.move_to_end(digest)
+            return dict(_workbook_cache[digest])
+
+    sheets = validate_sheets(pd.read_excel(BytesIO(data), sheet_name=SHEET_NAMES))
+    with _workbook_cache_lock:
+        _workbook_cache[digest] = sheets
+        while len(_workbook_cache) > WORKBOOK_CACHE_SIZE:
+            _workbook_cache.popitem(last=False)
+    return dict(sheets)
+
+
+def _to_time(value):
+    """Converts an 'HH:MM' string, time or datetime cell to `datetime.time`, or None if it is not one."""
+    if isinstance(value, time):
+        return value
+    if isinstance(value, datetime):
+        return value.time()
+    if isinstance(value, str):
+        parsed = pd.to_datetime(value, format='mixed', errors='coerce')
+        return None if pd.isna(parsed) else parsed.time()
+    return None
+
+
+def validate_sheets(sheets):
+    """Checks every sheet has the SHEET_COLUMNS and converts them to their types.
+
+    Blank rows are dropped, as are Off Days rows missing a name or date.
+    Raises ValueError naming the sheet, column and rows of the first other
+    missing or invalid value.
+    """
+    validated = {}
+    for sheet_name in SHEET_NAMES:
+        df = sheets[sheet_name]
+        columns = SHEET_COLUMNS[sheet_name]
+        missing = [column for column in columns if column not in df]
+        if missing:
+            raise ValueError(f"{sheet_name} is missing the column(s) {', '.join(missing)}")
+
+        how = 'any' if sheet_name == "Off Days" else 'all'
+        df = df.dropna(subset=list(columns), how=how).copy()
+
+        for column, kind in columns.items():
+            values = df[column]
+            if kind == "str":
+                converted = values.astype(str).str.strip().where(values.notna())
+            elif kind == "date":
+                converted = parse_dates(values)
+            elif kind == "time":
+                converted = values.map(_to_time)
+            else:
+                converted = pd.to_numeric(values, errors='coerce')
+
+            invalid = converted.isna()
+            if invalid.any():
+                # +2 for the header row and 1-based Excel rows
+                rows = ", ".join(str(row + 2) for row in invalid[invalid].index[:5])
+                raise ValueError(f"{sheet_name} has missing or invalid {column} values in row(s) {rows}")
+            df[column] = converted.astype(int) if kind == "int" else converted
+        validated[sheet_name] = df
+    return validated
+
+
+def shift_times(shift_df):
+    """Maps each shift to its ('HH:MM' start, 'HH:MM' end), as stored with a saved roster."""
+    return {shift: (start.strftime('%H:%M'), end.strftime('%H:%M')) for shift, start, end in zip(shift_df['Shift'], shift_df['Start'], shift_df['End'])}
+
+
+def build_inputs(sheets, business_type, demand_policy=None):
+    """Turns the roster sheets into the keyword arguments of `generate_roster`.
+
+    `demand_policy` overrides the business type's policy from DEMAND_POLICIES.
+    """
+    employee_df = sheets["Employee Information"]
+    shift_df = sheets["Shift Information"]
+    day_df = sheets["Day Information"]
+    off_days_df = sheets["Off Days"]
+    general_df = sheets["General Information"]
+
+    employees = employee_df['Employee'].tolist()
+    employee_status = dict(zip(employee_df['Employee'], employee_df['Status']))
+    shifts = shift_df['Shift'].tolist()
+
+    # Start and End are already `datetime.time` after validate_sheets
+    shift_hours = {shift: calculate_shift_hours(start, end) for shift, start, end in zip(shift_df['Shift'], shift_df['Start'], shift_df['End'])}
+
+    # Dates are parsed once here; the engine only sees the calendar's Timestamps
+    calendar = build_calendar(day_df)
+
+    off_days = {}
+    for date, employee in zip(off_days_df['Date'], off_days_df['Employee']):
+        if date not in off_days:
+            off_days[date] = []
+        off_days[date].append(employee)
+
+    return {
+        'employees': employees,
+        'employee_status': employee_status,
+        'shifts': shifts,
+        'dates': calendar.dates,
+        'shift_hours': shift_hours,
+        'min_employees_per_shift': dict(zip(shift_df['Shift'], shift_df['Min Employees'])),
+        'max_employees_per_day': general_df['Max Employees per Day'].iloc[0],
+        'min_hours': general_df['Min Hours per Employee'].iloc[0],
+        'max_hours': general_df['Max Hours per Employee'].iloc[0],
+        'off_days': off_days,
+        'demand_uplift': (demand_policy or DEMAND_POLICIES[business_type])(calendar).tolist(),
+    }
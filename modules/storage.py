@@ -0,0 +1,531 @@
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from modules.dates import day_ordinal, day_ordinals, from_ordinals, shift_hours, week_ordinal
+
+logger = logging.getLogger(__name__)
+
+# Availability used to live in data/availability_database.csv, which every
+# page read and rewrote in full. It now lives in an embedded SQLite database
+# in WAL mode so readers never block the writer and every write only touches
+# the rows it changes. The CSV is imported the first time the default
+# database, DB_PATH, is opened.
+#
+# Each (day, shift) slot is a row of `availability` and each employee working
+# it is a row of `assignments`, whose position keeps the order they were
+# assigned in. The comma-joined "Selected by" strings of the CSV are only
+# parsed on import and only rebuilt, in that order, for display. Performance
+# grades, which lived in data/performance_data.csv, are rows of `performance`
+# keyed by (day, staff).
+#
+# Saving a roster is append-only: its rows are written under a new
+# generation and `days` is pointed at it, which tombstones the rows of the
+# generation it supersedes. Only the rows of each day's current generation
+# are live; `compact` deletes the rest in the background.
+#
+# Days are stored as whole days since 1970-01-01 (see modules.dates) and are
+# datetime64 in every DataFrame the loaders return.
+#
+# The dated tables are partitioned by ISO week: every row carries the ordinal
+# of its week's Monday as the leading column of a WITHOUT ROWID primary key,
+# so each week's rows are stored together and a date range only reads the
+# weeks it overlaps.
+#
+# `weekly_hours` holds the hours each employee works in each week, from the
+# length of every shift stored with the shift. Every write that changes live
+# shifts or assignments refreshes only the weeks it touched.
+DB_PATH = os.path.join("data", "schedulease.db")
+LEGACY_CSV_PATH = os.path.join("data", "availability_database.csv")
+LEGACY_PERFORMANCE_CSV_PATH = os.path.join("data", "performance_data.csv")
+
+AVAILABILITY_COLUMNS = ["Day", "Shift", "Available", "Selected by", "Start", "End"]
+# columns an imported availability CSV must have, "Selected by" may be left out
+REQUIRED_CSV_COLUMNS = ["Day", "Shift", "Available", "Start", "End"]
+ASSIGNMENT_COLUMNS = ["Day", "Shift", "Employee"]
+PERFORMANCE_COLUMNS = ["Day", "Staff", "Performance"]
+WEEKLY_HOURS_COLUMNS = ["Week", "Employee", "Hours"]
+
+# superseded days to accumulate before save_roster starts a compaction
+COMPACT_AFTER = 1000
+
+# rows of an imported CSV held in memory at a time
+IMPORT_CHUNK_ROWS = 10000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    generation INTEGER PRIMARY KEY AUTOINCREMENT,
+    created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS days (
+    day INTEGER PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS availability (
+    week INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    shift TEXT NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0,
+    position INTEGER NOT NULL DEFAULT 0,
+    available INTEGER NOT NULL DEFAULT 0,
+    start TEXT,
+    "end" TEXT,
+    hours REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (week, day, shift, generation)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS availability_shift ON availability (shift);
+CREATE TABLE IF NOT EXISTS assignments (
+    week INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    shift TEXT NOT NULL,
+    employee TEXT NOT NULL,
+    generation INTEGER NOT NULL DEFAULT 0,
+    position INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (week, day, shift, employee, generation)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS assignments_employee ON assignments (employee);
+CREATE TABLE IF NOT EXISTS performance (
+    week INTEGER NOT NULL,
+    day INTEGER NOT NULL,
+    staff TEXT NOT NULL,
+    performance TEXT NOT NULL,
+    PRIMARY KEY (week, day, staff)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS performance_staff ON performance (staff);
+CREATE TABLE IF NOT EXISTS weekly_hours (
+    week INTEGER NOT NULL,
+    employee TEXT NOT NULL,
+    hours REAL NOT NULL,
+    PRIMARY KEY (week, employee)
+) WITHOUT ROWID;
+"""
+
+# rows whose generation is no longer their day's current one
+DEAD = "NOT EXISTS (SELECT 1 FROM days WHERE days.day = {table}.day AND days.generation = {table}.generation)"
+
+_initialised = set()
+_superseded = {}
+_compaction_lock = threading.Lock()
+# write transactions committed per database by this process
+_writes = {}
+
+
+@contextmanager
+def connect(db_path=None):
+    """Opens the database in a transaction that commits when the block exits."""
+    db_path = db_path or DB_PATH
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA synchronous = NORMAL")
+        if db_path not in _initialised:
+            _initialise(conn, db_path)
+            _initialised.add(db_path)
+        with conn:
+            yield conn
+        if conn.total_changes:
+            _writes[db_path] = _writes.get(db_path, 0) + 1
+    finally:
+        conn.close()
+
+
+def writes(db_path=None):
+    """Returns how many write transactions this process has committed to the database."""
+    return _writes.get(db_path or DB_PATH, 0)
+
+
+def _initialise(conn, db_path):
+    conn.execute("PRAGMA journal_mode = WAL")
+    with conn:
+        conn.executescript(SCHEMA)
+        # the legacy CSVs only ever held the app's own data
+        if db_path != DB_PATH:
+            return
+
+        empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM days)").fetchone()[0]
+        if empty and os.path.exists(LEGACY_CSV_PATH):
+            for chunk in _read_availability_csv(LEGACY_CSV_PATH):
+                _upsert_availability(conn, chunk)
+        empty = conn.execute("SELECT NOT EXISTS (SELECT 1 FROM performance)").fetchone()[0]
+        if empty and os.path.exists(LEGACY_PERFORMANCE_CSV_PATH):
+            performance_df = pd.read_csv(LEGACY_PERFORMANCE_CSV_PATH)
+            performance_df['Day'] = day_ordinals(performance_df['Day'])
+            _upsert_performance(conn, performance_df.dropna().astype(object).itertuples(index=False, name=None))
+
+
+def _assignment_rows(rows):
+    """Yields a (day, shift, employee, position) row per name of (day, shift, "Selected by") rows.
+
+    The position is the name's place in "Selected by".
+    """
+    for day, shift, selected_by in rows:
+        if isinstance(selected_by, str):
+            employees = [employee.strip() for employee in selected_by.split(",") if employee.strip()]
+            for position, employee in enumerate(employees):
+                yield day, shift, employee, position
+
+
+def _refresh_weekly_hours(conn, weeks):
+    """Recomputes `weekly_hours` for the given week ordinals from their live shifts."""
+    weeks = [(week,) for week in sorted(set(weeks))]
+    conn.executemany("DELETE FROM weekly_hours WHERE week = ?", weeks)
+    conn.executemany(
+        "INSERT INTO weekly_hours (week, employee, hours) "
+        "SELECT week, employee, sum(hours) FROM assignments JOIN availability USING (week, day, shift, generation) JOIN days USING (day, generation) "
+        "WHERE week = ? GROUP BY week, employee",
+        weeks,
+    )
+
+
+def _new_generation(conn):
+    return conn.execute("INSERT INTO generations DEFAULT VALUES").lastrowid
+
+
+def _read_availability_csv(file, chunksize=None):
+    """Yields an availability CSV in DataFrames of at most `chunksize` rows.
+
+    Raises ValueError before the first chunk if a required column is missing.
+    """
+    chunks = pd.read_csv(file, chunksize=chunksize or IMPORT_CHUNK_ROWS, dtype={'Shift': str, 'Selected by': str, 'Start': str, 'End': str})
+    with chunks:
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        missing = [column for column in REQUIRED_CSV_COLUMNS if column not in chunk.columns]
+        if missing:
+            raise ValueError(f"CSV is missing column(s): {', '.join(missing)}")
+        yield chunk
+        yield from chunks
+
+
+def _upsert_availability(conn, df):
+    df = df.assign(Day=day_ordinals(df['Day'])).dropna(subset=['Day', 'Shift'])
+    # the last row for a day and shift wins, as it would on a later upsert
+    df = df.drop_duplicates(subset=['Day', 'Shift'], keep='last')
+    df = df.reindex(columns=AVAILABILITY_COLUMNS)
+    df['Available'] = df['Available'].fillna(0).astype(int)
+    df['Week'] = week_ordinal(df['Day'])
+    df['Hours'] = shift_hours(df['Start'], df['End']).fillna(0)
+    # new shifts keep the order they have within each day of `df`
+    df['Position'] = df.groupby('Day').cumcount()
+    df = df.astype(object).where(df.notna(), None)
+
+    # days seen for the first time start a new generation, the rest are updated in place
+    generation = _new_generation(conn)
+    conn.executemany("INSERT OR IGNORE INTO days (day, generation) VALUES (?, ?)", ((day, generation) for day in df['Day'].unique()))
+    conn.executemany(
+        'INSERT INTO availability (week, day, shift, generation, position, available, start, "end", hours) '
+        'SELECT ?, day, ?, generation, ?, ?, ?, ?, ? FROM days WHERE day = ? '
+        'ON CONFLICT (week, day, shift, generation) DO UPDATE SET available = excluded.available, start = excluded.start, "end" = excluded."end", hours = excluded.hours',
+        df[['Week', 'Shift', 'Position', 'Available', 'Start', 'End', 'Hours', 'Day']].itertuples(index=False, name=None),
+    )
+    conn.executemany("DELETE FROM assignments WHERE week = ? AND day = ? AND shift = ?", df[['Week', 'Day', 'Shift']].itertuples(index=False, name=None))
+    conn.executemany(
+        "INSERT OR IGNORE INTO assignments (week, day, shift, employee, generation, position) SELECT ?, day, ?, ?, generation, ? FROM days WHERE day = ?",
+        ((week_ordinal(day), shift, employee, position, day) for day, shift, employee, position in _assignment_rows(zip(df['Day'], df['Shift'], df['Selected by']))),
+    )
+    _refresh_weekly_hours(conn, df['Week'].unique().tolist())
+    return len(df)
+
+
+def _date_range(start, end):
+    """Returns the WHERE clause and parameters selecting days between `start` and `end`.
+
+    The week bounds let SQLite skip straight to the weeks in the range.
+    """
+    conditions = []
+    params = []
+    if start is not None:
+        start = day_ordinal(start)
+        conditions += ["week >= ?", "day >= ?"]
+        params += [week_ordinal(start), start]
+    if end is not None:
+        end = day_ordinal(end)
+        conditions += ["week <= ?", "day <= ?"]
+        params += [week_ordinal(end), end]
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+def load_availability(start=None, end=None, db_path=None):
+    """Loads availability, optionally only the days between `start` and `end` inclusive.
+
+    Returns the same columns the CSV had, with "Day" as datetime and the
+    employees of each shift joined into "Selected by", in the order they
+    were assigned, for display.
+    """
+    where, params = _date_range(start, end)
+    query = (
+        "SELECT day, shift, available, "
+        # group_concat keeps the order of its subquery's rows
+        "(SELECT group_concat(employee, ', ') FROM (SELECT employee FROM assignments a WHERE a.week = availability.week AND a.day = availability.day "
+        "AND a.shift = availability.shift AND a.generation = availability.generation ORDER BY position)), "
+        'start, "end" FROM availability JOIN days USING (day, generation)' + where + " ORDER BY day, position, shift"
+    )
+    with connect(db_path) as conn:
+        df = pd.read_sql_query(query, conn, params=params)
+    df.columns = AVAILABILITY_COLUMNS
+    df['Day'] = from_ordinals(df['Day'])
+    return df
+
+
+def load_assignments(start=None, end=None, employee=None, db_path=None):
+    """Loads one row per employee per shift, optionally filtered by date range and employee.
+
+    The employees of each shift are in the order they were assigned.
+    """
+    where, params = _date_range(start, end)
+    if employee is not None:
+        where += (" AND" if where else " WHERE") + " employee = ?"
+        params.append(employee)
+    query = "SELECT day, shift, employee FROM assignments JOIN days USING (day, generation)" + where + " ORDER BY day, shift, position"
+    with connect(db_path) as conn:
+        df = pd.read_sql_query(query, conn, params=params)
+    df.columns = ASSIGNMENT_COLUMNS
+    df['Day'] = from_ordinals(df['Day'])
+    return df
+
+
+def load_weeks(db_path=None):
+    """Returns the Monday of every ISO week with availability, in order."""
+    with connect(db_path) as conn:
+        weeks = [row[0] for row in conn.execute("SELECT DISTINCT week FROM availability JOIN days USING (day, generation) ORDER BY week")]
+    return from_ordinals(weeks)
+
+
+def load_weekly_hours(start=None, end=None, employee=None, db_path=None):
+    """Loads the hours each employee works in each week, optionally only the weeks overlapping `start` to `end`.
+
+    "Week" is the Monday of the week.
+    """
+    conditions = []
+    params = []
+    if start is not None:
+        conditions.append("week >= ?")
+        params.append(week_ordinal(day_ordinal(start)))
+    if end is not None:
+        conditions.append("week <= ?")
+        params.append(week_ordinal(day_ordinal(end)))
+    if employee is not None:
+        conditions.append("employee = ?")
+        params.append(employee)
+    where = " WHERE " + " AND ".join(conditions) if conditions else ""
+    with connect(db_path) as conn:
+        df = pd.read_sql_query("SELECT week, employee, hours FROM weekly_hours" + where + " ORDER BY week, employee", conn, params=params)
+    df.columns = WEEKLY_HOURS_COLUMNS
+    df['Week'] = from_ordinals(df['Week'])
+    return df
+
+
+def upsert_availability(df, db_path=None):
+    """Inserts availability rows, replacing existing rows with the same Day and Shift.
+
+    The "Selected by" names of each row replace the shift's assignments.
+    """
+    with connect(db_path) as conn:
+        return _upsert_availability(conn, df)
+
+
+def import_availability(file, chunksize=None, db_path=None):
+    """Streams an availability CSV into the database, upserting on (Day, Shift).
+
+    `file` is a path or file-like object. Only `chunksize` rows are in memory
+    at a time and the whole import is one transaction, so a file that fails
+    to parse part way through imports nothing. Rows with invalid dates are
+    dropped. Returns the number of rows imported.
+    """
+    with connect(db_path) as conn:
+        return sum(_upsert_availability(conn, chunk) for chunk in _read_availability_csv(file, chunksize))
+
+
+def delete_availability(day=None, shift=None, db_path=None):
+    """Deletes all rows for a day, a shift, or a day and shift, with their assignments."""
+    conditions = []
+    params = []
+    if day is not None:
+        day = day_ordinal(day)
+        conditions += ["week = ?", "day = ?"]
+        params += [week_ordinal(day), day]
+    if shift is not None:
+        conditions.append("shift = ?")
+        params.append(shift)
+    if not conditions:
+        raise ValueError("delete_availability needs a day or a shift")
+
+    where = " WHERE " + " AND ".join(conditions)
+    with connect(db_path) as conn:
+        weeks = [row[0] for row in conn.execute("SELECT DISTINCT week FROM availability" + where, params)]
+        conn.execute("DELETE FROM assignments" + where, params)
+        deleted = conn.execute("DELETE FROM availability" + where, params).rowcount
+        if shift is None:
+            conn.execute("DELETE FROM days WHERE day = ?", (day,))
+        _refresh_weekly_hours(conn, weeks)
+        return deleted
+
+
+def select_shifts(selections, name, db_path=None):
+    """Assigns `name` to each (day, shift) in `selections`, taking one available slot of each.
+
+    Shifts `name` already works are left as they are. Returns the (day, shift)
+    selections that were not taken because no slot was left.
+    """
+    weeks = set()
+    not_taken = []
+    with connect(db_path) as conn:
+        for selection in selections:
+            day, shift = selection
+            day = day_ordinal(day)
+            week = week_ordinal(day)
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO assignments (week, day, shift, employee, generation, position) "
+                "SELECT week, day, shift, ?, generation, (SELECT coalesce(max(position) + 1, 0) FROM assignments a "
+                "WHERE a.week = availability.week AND a.day = availability.day AND a.shift = availability.shift AND a.generation = availability.generation) "
+                "FROM availability JOIN days USING (day, generation) WHERE week = ? AND day = ? AND shift = ? AND available > 0",
+                (name, week, day, shift),
+            ).rowcount
+            if inserted:
+                conn.execute(
+                    "UPDATE availability SET available = available - 1 WHERE week = ? AND day = ? AND shift = ? AND generation = (SELECT generation FROM days WHERE day = ?)",
+                    (week, day, shift, day),
+                )
+                weeks.add(week)
+            elif not conn.execute(
+                "SELECT 1 FROM assignments JOIN days USING (day, generation) WHERE week = ? AND day = ? AND shift = ? AND employee = ?",
+                (week, day, shift, name),
+            ).fetchone():
+                not_taken.append(selection)
+        _refresh_weekly_hours(conn, weeks)
+    return not_taken
+
+
+def remove_name(name, db_path=None):
+    """Removes `name` from every shift, freeing the slots they held."""
+    with connect(db_path) as conn:
+        conn.execute(
+            "UPDATE availability SET available = available + 1 WHERE (week, day, shift, generation) IN "
+            "(SELECT week, day, shift, generation FROM assignments JOIN days USING (day, generation) WHERE employee = ?)",
+            (name,),
+        )
+        # no other employee's hours change
+        conn.execute("DELETE FROM weekly_hours WHERE employee = ?", (name,))
+        return conn.execute("DELETE FROM assignments WHERE employee = ?", (name,)).rowcount
+
+
+def _upsert_performance(conn, rows):
+    conn.executemany(
+        "INSERT INTO performance (week, day, staff, performance) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (week, day, staff) DO UPDATE SET performance = excluded.performance",
+        ((week_ordinal(day), day, staff, grade) for day, staff, grade in rows),
+    )
+
+
+def load_performance(start=None, end=None, staff=None, db_path=None):
+    """Loads performance grades, optionally filtered by date range and staff member."""
+    where, params = _date_range(start, end)
+    if staff is not None:
+        where += (" AND" if where else " WHERE") + " staff = ?"
+        params.append(staff)
+    with connect(db_path) as conn:
+        df = pd.read_sql_query("SELECT day, staff, performance FROM performance" + where + " ORDER BY day, staff", conn, params=params)
+    df.columns = PERFORMANCE_COLUMNS
+    df['Day'] = from_ordinals(df['Day'])
+    return df
+
+
+def upsert_performance(day, grades, db_path=None):
+    """Stores the grade of each staff member in `grades` for `day` in one write.
+
+    Grades already given to the same staff member on the same day are replaced.
+    """
+    day = day_ordinal(day)
+    with connect(db_path) as conn:
+        _upsert_performance(conn, ((day, staff, grade) for staff, grade in grades.items()))
+    return len(grades)
+
+
+def save_roster(roster, shift_times, db_path=None):
+    """Stores a generated roster, superseding the shifts of every date it covers.
+
+    `roster` maps each date, as a Timestamp, to its {shift: employees}.
+    `shift_times` maps each shift to its ('HH:MM' start, 'HH:MM' end). Only
+    the roster's own rows are written, however much history is stored; the
+    rows it supersedes are left for `compact`. Returns the roster's generation.
+    """
+    db_path = db_path or DB_PATH
+    days = dict(zip(roster, day_ordinals(list(roster)).tolist()))
+    shifts = list(shift_times)
+    hours = dict(zip(shifts, shift_hours([shift_times[shift][0] for shift in shifts], [shift_times[shift][1] for shift in shifts]).fillna(0)))
+    with connect(db_path) as conn:
+        generation = _new_generation(conn)
+        superseded = conn.execute(f"SELECT count(*) FROM days WHERE day IN ({', '.join('?' * len(days))})", list(days.values())).fetchone()[0]
+        conn.executemany(
+            'INSERT INTO availability (week, day, shift, generation, position, available, start, "end", hours) VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?)',
+            (
+                (week_ordinal(days[date]), days[date], shift, generation, position, *shift_times[shift], hours[shift])
+                for date, shifts_dict in roster.items() for position, shift in enumerate(shifts_dict)
+            ),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO assignments (week, day, shift, employee, generation, position) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (week_ordinal(days[date]), days[date], shift, employee, generation, position)
+                for date, shifts_dict in roster.items() for shift, employees in shifts_dict.items() for position, employee in enumerate(employees)
+            ),
+        )
+        # pointing the days at the new generation tombstones their old rows
+        conn.executemany(
+            "INSERT INTO days (day, generation) VALUES (?, ?) ON CONFLICT (day) DO UPDATE SET generation = excluded.generation",
+            ((day, generation) for day in days.values()),
+        )
+        _refresh_weekly_hours(conn, [week_ordinal(day) for day in days.values()])
+
+    _superseded[db_path] = _superseded.get(db_path, 0) + superseded
+    if _superseded[db_path] >= COMPACT_AFTER:
+        compact_in_background(db_path)
+    return generation
+
+
+def compact(db_path=None):
+    """Deletes the rows of superseded generations, returning how many were deleted.
+
+    Each week is compacted in its own transaction, so the write lock is only
+    held for one week's rows at a time.
+    """
+    db_path = db_path or DB_PATH
+    _superseded[db_path] = 0
+    with connect(db_path) as conn:
+        weeks = [row[0] for row in conn.execute(
+            f"SELECT week FROM availability WHERE {DEAD.format(table='availability')} "
+            f"UNION SELECT week FROM assignments WHERE {DEAD.format(table='assignments')}"
+        )]
+
+    deleted = 0
+    for week in weeks:
+        with connect(db_path) as conn:
+            deleted += conn.execute("DELETE FROM assignments WHERE week = ? AND " + DEAD.format(table="assignments"), (week,)).rowcount
+            deleted += conn.execute("DELETE FROM availability WHERE week = ? AND " + DEAD.format(table="availability"), (week,)).rowcount
+    return deleted
+
+
+def compact_in_background(db_path=None):
+    """Runs `compact` on a daemon thread, unless one is already running.
+
+    Returns the thread, or None if a compaction was already running.
+    """
+    if not _compaction_lock.acquire(blocking=False):
+        return None
+
+    def run():
+        try:
+            deleted = compact(db_path)
+            logger.info("Compacted %d superseded rows", deleted)
+        except sqlite3.Error:
+            logger.exception("Compaction failed")
+        finally:
+            _compaction_lock.release()
+
+    thread = threading.Thread(target=run, name="storage-compaction", daemon=True)
+    thread.start()
+    return thread
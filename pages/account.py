@@ -3,6 +3,7 @@ from streamlit import session_state as ss
 import streamlit_authenticator as stauth
 import yaml
 from yaml.loader import SafeLoader
+from modules import roles
 from modules.nav import MenuButtons
 
 
@@ -13,16 +14,8 @@ with open(CONFIG_FILENAME) as file:
     config = yaml.load(file, Loader=SafeLoader)
 
 def get_roles():
-    """Gets user roles based on config file."""
-    with open(CONFIG_FILENAME) as file:
-        config = yaml.load(file, Loader=SafeLoader)
-
-    if config is not None:
-        cred = config['credentials']
-    else:
-        cred = {}
-
-    return {username: user_info['role'] for username, user_info in cred['usernames'].items() if 'role' in user_info}
+    """Gets user roles based on config file, see modules.roles."""
+    return roles.get_roles()
 
 st.header('Account page')
 
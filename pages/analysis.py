@@ -3,78 +3,41 @@ st.set_page_config(page_title="Analysis", layout="wide")
 from streamlit import session_state as ss
 from modules.nav import MenuButtons
 from pages.account import get_roles
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import timedelta
 import altair as alt
+from modules.dates import format_date
+from modules.cache import load_performance, load_weekly_hours, load_weeks
 
 if 'authentication_status' not in ss:
     st.switch_page('./pages/account.py')
 
 MenuButtons(get_roles())
 
-# Load availability data
-try:
-    availability_df = pd.read_csv('data/availability_database.csv', parse_dates=['Day'], infer_datetime_format=True)
-except FileNotFoundError:
+# The Monday of every week with availability
+weeks = load_weeks()
+if weeks.empty:
     st.error("No availability data found. Please upload the availability data in the Manager page.")
     st.stop()
 
-# Ensure the "Day" column is in datetime format
-availability_df['Day'] = pd.to_datetime(availability_df['Day'], errors='coerce')
-
-# Calculate shift duration
-def calculate_shift_duration(start, end):
-    start_time = datetime.strptime(start, '%H:%M').time()
-    end_time = datetime.strptime(end, '%H:%M').time()
-    
-    if end_time > start_time:
-        duration = datetime.combine(datetime.min, end_time) - datetime.combine(datetime.min, start_time)
-    else:
-        duration = datetime.combine(datetime.min + timedelta(days=1), end_time) - datetime.combine(datetime.min, start_time)
-        
-    return duration.total_seconds() / 3600
-
-# Add a column for shift duration
-availability_df['Shift Duration'] = availability_df.apply(lambda row: calculate_shift_duration(row['Start'], row['End']), axis=1)
-
-# Calculate total hours per employee
-def calculate_total_hours(df):
-    employees_hours = {}
-
-    for _, row in df.iterrows():
-        shift_duration = row['Shift Duration']
-        if pd.notna(row['Selected by']):
-            employees = row['Selected by'].split(', ')
-            for employee in employees:
-                if employee in employees_hours:
-                    employees_hours[employee] += shift_duration
-                else:
-                    employees_hours[employee] = shift_duration
-
-    return employees_hours
-
-# add a column for week number
-availability_df['Week'] = availability_df['Day'].dt.isocalendar().week
-
-# Drop NA values from 'Week' column before getting the unique values
-unique_weeks = sorted(availability_df['Week'].dropna().unique())
+def week_label(week):
+    return "Overall" if week == "Overall" else f"{week.isocalendar().week} ({format_date(week)})"
 
 # Create a sidebar for week selection
-selected_week = st.sidebar.selectbox("Select Week", ["Overall"] + [str(week) for week in unique_weeks])
+selected_week = st.sidebar.selectbox("Select Week", ["Overall"] + list(weeks), format_func=week_label)
 
-# filter data based on the selected week
+# only the selected week is loaded from storage
 if selected_week != "Overall":
-    selected_week = int(selected_week)
-    filtered_df = availability_df[availability_df['Week'] == selected_week]
+    start, end = selected_week, selected_week + timedelta(days=6)
 else:
-    filtered_df = availability_df
+    start = end = None
 
-employees_hours = calculate_total_hours(filtered_df)
-employee_hours_df = pd.DataFrame(list(employees_hours.items()), columns=['Employee', 'Total Hours'])
+# Total hours per employee, from the hours stored per employee per week
+weekly_hours_df = load_weekly_hours(start, end)
+employee_hours_df = weekly_hours_df.groupby('Employee', sort=False, as_index=False)['Hours'].sum().rename(columns={'Hours': 'Total Hours'})
 
 # display total hours per employee in a chart
 st.title("Employee Work Analysis")
-st.write(f"### Total Hours per Employee - Week {selected_week if selected_week != 'Overall' else 'Overall'}")
+st.write(f"### Total Hours per Employee - Week {week_label(selected_week)}")
 
 # Create a bar chart using Altair
 chart = alt.Chart(employee_hours_df).mark_bar().encode(
@@ -83,7 +46,7 @@ chart = alt.Chart(employee_hours_df).mark_bar().encode(
     color='Employee',
     tooltip=['Employee', 'Total Hours']
 ).properties(
-    title=f'Total Hours per Employee - Week {selected_week if selected_week != "Overall" else "Overall"}'
+    title=f'Total Hours per Employee - Week {week_label(selected_week)}'
 ).interactive()
 
 st.altair_chart(chart, use_container_width=True)
@@ -93,29 +56,19 @@ csv = employee_hours_df.to_csv(index=False).encode('utf-8')
 st.download_button(
     label="Download data as CSV",
     data=csv,
-    file_name=f'employee_work_hours_week_{selected_week if selected_week != "Overall" else "overall"}.csv',
+    file_name=f'employee_work_hours_week_{format_date(selected_week, "%G-W%V") if selected_week != "Overall" else "overall"}.csv',
     mime='text/csv',
 )
 
-# Load performance data
-try:
-    performance_df = pd.read_csv('data/performance_data.csv', parse_dates=['Day'], infer_datetime_format=True)
-except FileNotFoundError:
+# Load performance data for the selected week
+filtered_performance_df = load_performance(start, end)
+if filtered_performance_df.empty:
     st.error("No performance data found. Please upload performance data in the Manager page.")
     st.stop()
 
-# Ensure the "Day" column is in datetime format
-performance_df['Day'] = pd.to_datetime(performance_df['Day'], errors='coerce')
-
-# Filter data based on the selected week
-if selected_week != "Overall":
-    filtered_performance_df = performance_df[performance_df['Day'].dt.isocalendar().week == selected_week]
-else:
-    filtered_performance_df = performance_df
-
 # Display performance data in a chart
 st.write("### Performance Analysis")
-selected_employee = st.selectbox("Select Employee", ["All"] + list(performance_df['Staff'].unique()))
+selected_employee = st.selectbox("Select Employee", ["All"] + list(filtered_performance_df['Staff'].unique()))
 
 if selected_employee != "All":
     filtered_performance_df = filtered_performance_df[filtered_performance_df['Staff'] == selected_employee]
@@ -3,8 +3,10 @@ st.set_page_config(page_title="Employee", layout="wide")
 from streamlit import session_state as ss
 from modules.nav import MenuButtons
 from pages.account import get_roles
-import pandas as pd
-import datetime
+import numpy as np
+from modules.dates import KEY_FORMAT, format_date
+from modules.cache import load_availability, load_availability_grid
+from modules.storage import import_availability, select_shifts
 
 # If the user reloads or refreshes the page while still logged in,
 # go to the account page to restore the login status. Note reloading
@@ -18,119 +20,114 @@ MenuButtons(get_roles())
 # Employee dashboard interface
 st.title("Employee Dashboard")
 
-# Function to load availability data
-def load_availability_data():
-    if 'available_days' not in ss:
-        try:
-            # Read CSV with flexible datetime parsing
-            ss.available_days = pd.read_csv('data/availability_database.csv', parse_dates=['Day'], infer_datetime_format=True)
-        except FileNotFoundError:
-            # If the file is not found, initialize an empty DataFrame
-            ss.available_days = pd.DataFrame(columns=["Day", "Shift", "Available", "Selected by"])
-
-    # Ensure the "Day" column is in datetime format
-    ss.available_days['Day'] = pd.to_datetime(ss.available_days['Day'], errors='coerce')
-    # Remove rows with invalid dates
-    ss.available_days = ss.available_days.dropna(subset=['Day'])
-
-# Load availability data
-load_availability_data()
+# Load availability data, shared by every session until it changes
+available_days = load_availability()
 
 # an option to upload a CSV file if the DataFrame is empty
-if ss.available_days.empty:
+if available_days.empty:
     uploaded_file = st.file_uploader("Upload a CSV file to populate availability data", type=["csv"])
     if uploaded_file is not None:
-        # Load the uploaded file into the session state
-        ss.available_days = pd.read_csv(uploaded_file, parse_dates=['Day'], infer_datetime_format=True)
-        # Ensure the "Day" column is in datetime format
-        ss.available_days['Day'] = pd.to_datetime(ss.available_days['Day'], errors='coerce')
-        # Remove rows with invalid dates
-        ss.available_days = ss.available_days.dropna(subset=['Day'])
-        # Save the uploaded file to the local directory for future use
-        ss.available_days.to_csv('data/availability_database.csv', index=False)
+        # Save the uploaded file to the database, rows with invalid dates are dropped
+        try:
+            import_availability(uploaded_file)
+        except ValueError as e:
+            st.error(f"The uploaded file could not be imported: {e}")
+        available_days = load_availability()
+
+# Weeks of the shift picker shown at a time
+WEEKS_PER_PAGE = 4
+
+def checkbox_key(date, shift):
+    return f"checkbox_{format_date(date, KEY_FORMAT)}_{shift}"
+
+# Remember a checkbox's selection, so it survives while its week is not shown
+def toggle_shift(slot, key):
+    if ss[key]:
+        ss.selected_shifts.add(slot)
+    else:
+        ss.selected_shifts.discard(slot)
+
+# Forget selections and untick their checkboxes
+def clear_shifts(slots):
+    for date, shift in slots:
+        ss.selected_shifts.discard((date, shift))
+        key = checkbox_key(date, shift)
+        if key in ss:
+            ss[key] = False
+
+# Submit the selected shifts before the page reruns, so they are no longer ticked when it does
+def submit_selection(slots):
+    if ss.employee_name and slots:
+        # Only the selected shifts are updated in the database
+        ss.not_taken = select_shifts(slots, ss.employee_name)
+        clear_shifts(slots)
 
 # Function to display available days as checkboxes
-def display_days_in_grid(days_df):
-    selected_days = []
-    days_df["Day"] = pd.to_datetime(days_df["Day"], errors='coerce').dt.strftime("%Y-%m-%d")
-    start_date = pd.to_datetime(days_df["Day"].min(), errors='coerce')
-    end_date = pd.to_datetime(days_df["Day"].max(), errors='coerce')
-
-    if pd.isna(start_date) or pd.isna(end_date):
-       # st.error("Invalid date data. Please check the 'Day' column in your CSV file.")
-        return selected_days
-
-    if "Shift" not in days_df.columns:
-        st.error("The data does not contain 'Shift' column.")
-        return selected_days
-
-    current_date = start_date
-    shift_types = days_df["Shift"].unique()
-
-    while current_date <= end_date:
-        week_dates = pd.date_range(start=current_date, periods=7).strftime("%Y-%m-%d")
-        week_fully_booked = True  # Variable to track if all shifts in the week are taken
-
-        for date in week_dates:
-            if pd.to_datetime(date) > end_date:
-                break
-            if date in days_df["Day"].values:
-                for shift in shift_types:
-                    if shift in days_df.loc[days_df["Day"] == date, "Shift"].values:
-                        available = days_df.loc[(days_df["Day"] == date) & (days_df["Shift"] == shift), "Available"].values[0]
+def display_days_in_grid(grid):
+    """Shows a checkbox per open slot of the day x shift `grid`, a page of weeks at a time.
+
+    Returns the selected (date, shift) slots that are still open, on every page.
+    """
+    if 'selected_shifts' not in ss:
+        ss.selected_shifts = set()
+
+    # selections of slots that have since been filled or deleted are dropped
+    for date, shift in [slot for slot in ss.selected_shifts if not (slot[0] in grid.index and slot[1] in grid.columns and grid.at[slot] > 0)]:
+        ss.selected_shifts.discard((date, shift))
+        ss.pop(checkbox_key(date, shift), None)
+    if grid.empty:
+        return []
+
+    # weeks where all shifts are taken are skipped
+    open_days = (grid > 0).to_numpy().any(axis=1)
+    week_starts = np.arange(0, len(grid), 7)
+    open_weeks = week_starts[np.logical_or.reduceat(open_days, week_starts)].tolist()
+    pages = [open_weeks[i:i + WEEKS_PER_PAGE] for i in range(0, len(open_weeks), WEEKS_PER_PAGE)]
+
+    def page_label(page):
+        first, last = pages[page][0], min(pages[page][-1] + 6, len(grid) - 1)
+        return f"{format_date(grid.index[first])} - {format_date(grid.index[last])}"
+
+    # only the weeks of the selected page are rendered
+    page = st.selectbox("Show weeks", range(len(pages)), format_func=page_label) if pages else None
+    shift_types = grid.columns
+    for week_start in pages[page] if pages else []:
+        week = grid.iloc[week_start:week_start + 7]
+
+        with st.container():
+            st.write(f"### Week of {format_date(week.index[0], KEY_FORMAT)}")
+            columns = st.columns(7)
+
+            for column, date, slots in zip(columns, week.index, week.to_numpy()):
+                with column:
+                    st.write(date.strftime("%a %d-%b"))
+                    for shift, available in zip(shift_types, slots):
                         if available > 0:
-                            week_fully_booked = False
-                            break
-
-        if not week_fully_booked:
-            with st.container():
-                st.write(f"### Week of {current_date.strftime('%Y-%m-%d')}")
-                col1, col2, col3, col4, col5, col6, col7 = st.columns(7)
-                columns = [col1, col2, col3, col4, col5, col6, col7]
-
-                for idx, date in enumerate(week_dates):
-                    if pd.to_datetime(date) > end_date:
-                        break
-                    with columns[idx]:
-                        st.write(pd.to_datetime(date).strftime("%a %d-%b"))
-                        for shift in shift_types:
-                            if date in days_df["Day"].values and shift in days_df.loc[days_df["Day"] == date, "Shift"].values:
-                                available = days_df.loc[(days_df["Day"] == date) & (days_df["Shift"] == shift), "Available"].values[0]
-                                if available > 0:
-                                    if st.checkbox(f"{shift} ({available})", key=f"checkbox_{date}_{shift}"):
-                                        selected_days.append((date, shift))
-        current_date += datetime.timedelta(days=7)
-
-    return selected_days
+                            key = checkbox_key(date, shift)
+                            st.checkbox(f"{shift} ({int(available)})", value=(date, shift) in ss.selected_shifts, key=key, on_change=toggle_shift, args=((date, shift), key))
+
+    return sorted(ss.selected_shifts)
 
 # Display available days and allow selection
-selected_days = display_days_in_grid(ss.available_days)
+selected_days = display_days_in_grid(load_availability_grid())
 
 # Check if there are available days to display
-if not ss.available_days.empty:
+if not available_days.empty:
     if selected_days:
         st.write("### Selected Dates:")
         for day, shift in selected_days:
-            st.write(f"- {day} ({shift})")
+            st.write(f"- {format_date(day, KEY_FORMAT)} ({shift})")
 
     # Allow employee to enter their name and submit selections
-    name = st.text_input("Enter your name")
-    if st.button("Submit Selection"):
-        if name and selected_days:
-            for day, shift in selected_days:
-                existing_names = ss.available_days.loc[(ss.available_days["Day"].astype(str) == day) & (ss.available_days["Shift"] == shift), "Selected by"].values
-                if len(existing_names) > 0 and pd.notna(existing_names[0]):
-                    updated_names = f"{existing_names[0]}, {name}"
-                else:
-                    updated_names = name
-                ss.available_days.loc[(ss.available_days["Day"].astype(str) == day) & (ss.available_days["Shift"] == shift), "Selected by"] = updated_names
-                ss.available_days.loc[(ss.available_days["Day"].astype(str) == day) & (ss.available_days["Shift"] == shift), "Available"] -= 1
-
-            # Save updated data back to CSV
-            ss.available_days.to_csv('data/availability_database.csv', index=False)
-
-            st.success("Your selections have been submitted!")
-            st.write("### Updated Availability:")
-            st.dataframe(ss.available_days)
+    st.text_input("Enter your name", key="employee_name")
+    st.button("Submit Selection", on_click=submit_selection, args=(selected_days,))
+    if 'not_taken' in ss:
+        not_taken = ss.pop('not_taken')
+        if not_taken:
+            # another employee took the last slot since the page was loaded
+            st.warning("These shifts are already full and were not selected: " + ", ".join(f"{format_date(day, KEY_FORMAT)} ({shift})" for day, shift in not_taken))
+        st.success("Your selections have been submitted!")
+        st.write("### Updated Availability:")
+        st.dataframe(available_days)
 else:
     st.write("No available days uploaded yet.")
@@ -7,7 +7,9 @@ import pandas as pd
 from io import StringIO  #for the download csv function
 from io import BytesIO
 import io
-import os
+from modules.dates import format_date
+from modules.cache import load_assignments, load_availability
+from modules.storage import delete_availability, import_availability, remove_name, upsert_performance
 
 
 
@@ -24,69 +26,58 @@ st.title("Upload File")
 
 
 
-# Load availability data
-if 'available_days' not in st.session_state:
-    try:
-        st.session_state.available_days = pd.read_csv('data/availability_database.csv', parse_dates=['Day'], infer_datetime_format=True)
-    except FileNotFoundError:
-        st.session_state.available_days = pd.DataFrame(columns=["Day", "Shift", "Available", "Selected by", "Start", "End", "Performance"])
-
-# Function to parse CSV and return a dataframe
-def parse_csv(uploaded_file):
-    return pd.read_csv(uploaded_file, parse_dates=['Day'], infer_datetime_format=True)
+# Load availability data, shared by every session until it changes
+available_days = load_availability()
 
 # Upload new CSV
 uploaded_file = st.file_uploader("Choose a CSV file to upload", type="csv")
-if uploaded_file:
-    new_data = parse_csv(uploaded_file)
-    if not st.session_state.available_days.empty:
-        st.session_state.available_days = pd.concat([st.session_state.available_days, new_data]).drop_duplicates().reset_index(drop=True)
+# the uploader keeps its file across reruns, so each upload is only imported once
+if uploaded_file and ss.get('imported_file_id') != uploaded_file.file_id:
+    try:
+        # Rows for a day and shift already in the database replace the existing ones
+        imported = import_availability(uploaded_file)
+    except ValueError as e:
+        st.error(f"The uploaded file could not be imported: {e}")
     else:
-        st.session_state.available_days = new_data
-    st.session_state.available_days.to_csv('data/availability_database.csv', index=False)
-    st.success("File uploaded successfully!")
+        ss.imported_file_id = uploaded_file.file_id
+        available_days = load_availability()
+        st.success(f"File uploaded successfully! {imported} row(s) imported.")
 
 # Check if the file is uploaded and available
-if st.session_state.available_days.empty:
+if available_days.empty:
     st.warning("No data available. Please upload a file.")
 else:
-    st.session_state.available_days['Day'] = pd.to_datetime(st.session_state.available_days['Day'], dayfirst=True, errors='coerce').dt.strftime('%d/%m/%Y')
-
-    # Display current availability
+    # Display current availability, days stay datetimes and are only formatted on screen
     st.write("### Current Availability")
-    st.dataframe(st.session_state.available_days)
+    st.dataframe(available_days, column_config={"Day": st.column_config.DateColumn("Day", format="DD/MM/YYYY")})
 
     # Allow manager to remove entries
     st.write("### Remove Entries")
     remove_type = st.selectbox("Select what to remove", ["Date", "Shift", "Name"])
 
     if remove_type == "Name":
-        all_names = st.session_state.available_days["Selected by"].dropna().str.split(", ").explode().unique()
+        all_names = load_assignments()["Employee"].unique()
         name_to_remove = st.selectbox("Select name to remove", all_names)
         if st.button("Remove Name"):
-            st.session_state.available_days["Selected by"] = st.session_state.available_days["Selected by"].apply(lambda x: ', '.join([n for n in x.split(', ') if n != name_to_remove]) if pd.notna(x) else x)
-            st.session_state.available_days["Available"] += st.session_state.available_days["Selected by"].apply(lambda x: 1 if not x else 0)
-            st.session_state.available_days["Selected by"] = st.session_state.available_days["Selected by"].replace("", None)
-            st.session_state.available_days.to_csv('data/availability_database.csv', index=False)
+            remove_name(name_to_remove)
+            available_days = load_availability()
             st.success(f"Removed all instances of {name_to_remove}.")
 
     elif remove_type == "Date":
-        st.session_state.available_days['Day'] = pd.to_datetime(st.session_state.available_days['Day'], errors='coerce')
-
-        all_dates = st.session_state.available_days["Day"].dropna().unique()
-        date_to_remove = st.date_input("Select date to remove", min_value=min(all_dates), max_value=max(all_dates))
+        all_dates = available_days["Day"]
+        date_to_remove = st.date_input("Select date to remove", min_value=all_dates.min(), max_value=all_dates.max())
 
         if st.button("Remove Date"):
-            st.session_state.available_days = st.session_state.available_days[st.session_state.available_days["Day"] != pd.to_datetime(date_to_remove)]
-            st.session_state.available_days.to_csv('data/availability_database.csv', index=False)
-            st.success(f"Removed all entries for {date_to_remove.strftime('%d/%m/%Y')}.")
+            delete_availability(day=date_to_remove)
+            available_days = load_availability()
+            st.success(f"Removed all entries for {format_date(date_to_remove)}.")
 
     elif remove_type == "Shift":
-        all_shifts = st.session_state.available_days["Shift"].unique()
+        all_shifts = available_days["Shift"].unique()
         shift_to_remove = st.selectbox("Select shift to remove", all_shifts)
         if st.button("Remove Shift"):
-            st.session_state.available_days = st.session_state.available_days[st.session_state.available_days["Shift"] != shift_to_remove]
-            st.session_state.available_days.to_csv('data/availability_database.csv', index=False)
+            delete_availability(shift=shift_to_remove)
+            available_days = load_availability()
             st.success(f"Removed all entries for {shift_to_remove}.")
 
     # Allows the manager to input performance
@@ -94,29 +85,14 @@ else:
     performance_grades = ["Excellent", "Good", "Fair", "Poor"]
 
     # Display just the date in the selectbox
-    st.session_state.available_days["Day"] = pd.to_datetime(st.session_state.available_days['Day'], errors='coerce')
-    all_dates = st.session_state.available_days["Day"].dropna().unique()
-    selected_date = st.date_input("Select date", min_value=min(all_dates), max_value=max(all_dates))
+    all_dates = available_days["Day"]
+    selected_date = st.date_input("Select date", min_value=all_dates.min(), max_value=all_dates.max())
 
-    # Format the selected_date for further use
-    selected_date_str = selected_date.strftime('%d/%m/%Y')
-    selected_shift = st.selectbox("Select shift", st.session_state.available_days["Shift"].unique())
+    selected_shift = st.selectbox("Select shift", available_days["Shift"].unique())
 
     # Filter employees based on selected date and shift
-    filtered_employees = st.session_state.available_days[
-        (st.session_state.available_days["Day"].dt.strftime('%d/%m/%Y') == selected_date_str) & 
-        (st.session_state.available_days["Shift"] == selected_shift)
-    ]["Selected by"]
-
-    # Drop rows where 'Selected by' is NaN or empty, then split the names
-    filtered_employees = filtered_employees.dropna()  # Remove NaN values
-    filtered_employees = filtered_employees[filtered_employees != ""]  # Remove empty strings
-    
-    # If there are any valid employees, split and process them
-    if not filtered_employees.empty:
-        filtered_employees = filtered_employees.str.split(", ").explode().unique()
-    else:
-        filtered_employees = []  # Set to empty if no valid names are found
+    shift_assignments = load_assignments(start=selected_date, end=selected_date)
+    filtered_employees = shift_assignments.loc[shift_assignments["Shift"] == selected_shift, "Employee"].tolist()
     
     # create a dictionary for performance input for managers
     performance_dict = {employee: "" for employee in filtered_employees}
@@ -125,21 +101,9 @@ else:
     for employee in filtered_employees:
         performance_dict[employee] = st.selectbox(f"Select performance for {employee}", performance_grades, key=f"performance_{employee}")
 
-    # Save performance data to a CSV file for future analysis
+    # Save performance data to the database for future analysis
     if st.button("Submit Performance"):
-        performance_data = pd.read_csv('data/performance_data.csv') if os.path.exists('data/performance_data.csv') else pd.DataFrame(columns=["Day", "Staff", "Performance"])
-
-        # Ensure the selected_date is in the desired format
-        formatted_date = pd.to_datetime(selected_date_str, dayfirst=True).strftime('%d/%m/%Y')
-
-        for employee, performance in performance_dict.items():
-            # Remove existing entry for the same day and staff if it exists
-            performance_data = performance_data[~((performance_data["Day"] == formatted_date) & (performance_data["Staff"] == employee))]
-            # Add the new entry
-            new_data = {"Day": formatted_date, "Staff": employee, "Performance": performance}
-            performance_data = pd.concat([performance_data, pd.DataFrame([new_data])], ignore_index=True)
-
-        performance_data.to_csv('data/performance_data.csv', index=False)
+        upsert_performance(selected_date, performance_dict)
         st.success("Performance data updated successfully!")
 
 def download_template():
@@ -1,46 +1,261 @@
 import streamlit as st
 from io import BytesIO
 import pandas as pd
-import random
-from datetime import timedelta, datetime
 import altair as alt
 from streamlit import session_state as ss
 from modules.nav import MenuButtons
 from pages.account import get_roles
-import os
-import numpy as np
-import subprocess
-import importlib
+from modules.roster import build_inputs, build_roster, read_workbook, reroster, roster_tables, save_uploaded_file, shift_times, touch_upload, write_roster_excel
+from modules.dates import format_date
+from modules.storage import save_roster
 
 
-# Define the CSV file path
-CSV_FILE_PATH = "data/roster_data.csv"
-
 if 'authentication_status' not in ss:
     st.switch_page('./pages/account.py')
 
 MenuButtons(get_roles())
 
 
-# Dropdown menu for business type selection
-business_type = st.selectbox('Select Business Type:', ['Hotel', 'FnB', 'Retail', 'Others'])
+# Per business type page settings. Only the "Day Information" and "Off Days"
+# templates and the demand policy differ between business types.
+BUSINESS_TYPES = {
+    'Hotel': {
+        'title': "Hotel Employee Roster Generator",
+        'template_file_name': "hotel_template.xlsx",
+        'day_data': {
+            "Day": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+            "Busyness Level": [1, 1, 1, 1, 2, 3, 2]
+        },
+        'off_days_data': {
+            "Employee": ["Name", "Name"],
+            "Day": ["Monday", "Tuesday"]
+        },
+        'general_data': {
+            "Min Employees per Day": [6],
+            "Max Employees per Day": [15],
+            "Min Hours per Employee": [10],
+            "Max Hours per Employee": [90]
+        },
+    },
+    'FnB': {
+        'title': "Food and Beverage Employee Roster Generator",
+        'template_file_name': "fnb_template.xlsx",
+    },
+    'Retail': {
+        'title': "Retail Roster Generator",
+        'template_file_name': "retail_template.xlsx",
+    },
+    'Others': {
+        'title': "Others Employee Roster Generator",
+        'template_file_name': "Others_template.xlsx",
+    },
+}
 
-# Map selection to module names
-module_map = {
-    'Hotel': 'hotel',
-    'FnB': 'fnb',
-    'Retail': 'retail',
-    'Others': 'other',
+# FnB, Retail and Others share the weekend/holiday template
+for business_type in ['FnB', 'Retail', 'Others']:
+    BUSINESS_TYPES[business_type].update({
+        'day_data': {
+            "Day": ["Date", "Date", "Date", "Date"],
+            "Holiday": ["Date", "Date", "Date", "Date"]
+        },
+        'off_days_data': {
+            "Employee": ["Name", "Name"],
+            "Day": ["Date", "Date"]
+        },
+        'general_data': {
+            "Min Employees per Day": [6],
+            "Max Employees per Day": [15],
+            "Min Hours per Employee": [30],
+            "Max Hours per Employee": [60]
+        },
+    })
 
-}
 
-# Dynamically import the selected module
-if business_type in module_map:
-    module_name = module_map[business_type]
-    module = importlib.import_module(f'pages.{module_name}')
+# Page labels for the roster modes of modules.roster.build_roster
+ROSTER_MODES = {"Quick": "quick", "Best of N": "best-of-n", "Optimise": "optimise"}
+
+
+def display_roster(roster, total_hours):
+    roster_df, hours_df = roster_tables(roster, total_hours)
+
+    st.write("### Employee Roster")
+    st.table(roster_df)
+
+    st.write("### Total Hours Worked by Each Employee")
+    st.table(hours_df)
+
+    return roster_df, hours_df
+
+
+def create_barchart(hours_df):
+    chart = alt.Chart(hours_df).mark_bar().encode(
+        x='Employee',
+        y='Hours',
+        color='Employee'
+    ).properties(
+        title='Total Hours Worked by Each Employee'
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+
+def edit_roster(inputs, shift_df):
+    """Applies one off day or min employees change to the generated roster.
+
+    Only the affected dates and shifts are rerostered and saved.
+    """
+    state = ss.roster
+    with st.expander("Edit roster"):
+        off_day_tab, min_employees_tab = st.tabs(["Add off day", "Change min employees"])
+
+        with off_day_tab:
+            employee = st.selectbox("Employee", inputs['employees'])
+            date = st.selectbox("Date", inputs['dates'], format_func=format_date)
+            if st.button("Add Off Day"):
+                off_days = dict(state['off_days'])
+                off_days[date] = off_days.get(date, []) + [employee]
+                changes = {'off_days': off_days, 'changed_dates': [date]}
+            else:
+                changes = None
+
+        with min_employees_tab:
+            shift = st.selectbox("Shift", inputs['shifts'])
+            min_employees = st.number_input("Min employees", min_value=0, value=int(state['min_employees_per_shift'][shift]))
+            if st.button("Change Min Employees"):
+                min_employees_per_shift = dict(state['min_employees_per_shift'])
+                min_employees_per_shift[shift] = min_employees
+                changes = {'min_employees_per_shift': min_employees_per_shift, 'changed_shifts': [shift]}
+
+    if changes:
+        edited_inputs = dict(inputs, off_days=state['off_days'], min_employees_per_shift=state['min_employees_per_shift'])
+        edited_inputs.update((key, changes[key]) for key in ['off_days', 'min_employees_per_shift'] if key in changes)
+        roster, total_hours, updated_dates = reroster(state['roster'], state['total_hours'], **edited_inputs, changed_dates=changes.get('changed_dates', ()), changed_shifts=changes.get('changed_shifts', ()))
+
+        if updated_dates:
+            save_roster({date: roster[date] for date in updated_dates}, shift_times(shift_df))
+        state.pop('xlsx', None)
+        state.update(roster=roster, total_hours=total_hours, off_days=edited_inputs['off_days'], min_employees_per_shift=edited_inputs['min_employees_per_shift'])
+        st.success(f"Roster updated on {len(updated_dates)} date(s).")
+
+
+def main(business_type):
+    settings = BUSINESS_TYPES[business_type]
+    st.title(settings['title'])
+
+    file_path = None  # Initialize file_path to None
 
-    # Call the main function of the imported module
-    if hasattr(module, 'main'):
-        module.main()
+    # Each session keeps the path of its upload, which is shared with any session that uploaded the same file
+    if 'file_path' in st.session_state and not touch_upload(st.session_state.file_path):
+        st.warning("Your uploaded file has expired, please upload it again.")
+        del st.session_state.file_path
+
+    if 'file_path' not in st.session_state:
+        uploaded_file = st.file_uploader("Choose an Excel file", type=["xlsx"])
+
+        if uploaded_file:
+            file_path = save_uploaded_file(uploaded_file)
+            st.session_state.file_path = file_path
     else:
-        st.error(f"Module {module_name} does not have a main() function.")
+        file_path = st.session_state.file_path
+        uploaded_file = None
+
+    if file_path:
+        try:
+            sheets = read_workbook(file_path)
+        except ValueError as e:
+            st.error(f"The uploaded workbook could not be read: {e}")
+            return
+        for sheet_df in sheets.values():
+            st.dataframe(sheet_df)
+
+        # e.g. a Retail workbook read as a Hotel one has no Arrivals and Departures columns
+        try:
+            inputs = build_inputs(sheets, business_type)
+        except ValueError as e:
+            st.error(f"The uploaded workbook does not fit the {business_type} business type: {e}")
+            return
+
+        # Optimise mode solves the whole horizon and also enforces min hours, but takes longer.
+        # Best of N keeps the best scoring of N reproducible quick rosters.
+        mode = st.radio("Roster mode", ["Quick", "Best of N", "Optimise"], horizontal=True)
+        options = {}
+        if mode == "Optimise":
+            options['time_limit'] = st.number_input("Time limit (seconds)", min_value=1, max_value=600, value=10)
+        elif mode == "Best of N":
+            options['n_seeds'] = st.number_input("Number of rosters to try", min_value=1, max_value=1000, value=16)
+
+        if st.button("Generate Roster"):
+            try:
+                with st.spinner("Generating roster..."):
+                    roster, total_hours = build_roster(inputs, mode=ROSTER_MODES[mode], **options)
+
+                # Save the roster to the database
+                save_roster(roster, shift_times(sheets["Shift Information"]))
+
+                # Keep the roster and the inputs it was built from so it can be edited later
+                ss.roster = {
+                    'file_path': file_path,
+                    'roster': roster,
+                    'total_hours': total_hours,
+                    'off_days': inputs['off_days'],
+                    'min_employees_per_shift': inputs['min_employees_per_shift'],
+                }
+            except Exception as e:
+                st.error(f"An error occurred: {e}")
+                st.error(f"I'm having some trouble generating your roster :(")
+                st.error(f"Please rerun again!")
+
+        if 'roster' in ss and ss.roster['file_path'] == file_path:
+            edit_roster(inputs, sheets["Shift Information"])
+
+            roster_df, hours_df = display_roster(ss.roster['roster'], ss.roster['total_hours'])
+            create_barchart(hours_df)
+
+            # The workbook is built once per roster rather than on every rerun
+            if 'xlsx' not in ss.roster:
+                with BytesIO() as buffer:
+                    write_roster_excel(buffer, ss.roster['roster'], ss.roster['total_hours'])
+                    ss.roster['xlsx'] = buffer.getvalue()
+
+            st.download_button(
+                label="Download Roster and Total Hours",
+                data=ss.roster['xlsx'],
+                file_name="roster_and_total_hours.xlsx",
+                mime="application/vnd.ms-excel"
+            )
+        else:
+            st.info("Generating the roster will automatically add the staff to the database. To change it, Regenerate the roster again.")
+    # Providing a template download link if no file is uploaded
+    employee_data = {
+        "Employee": ["Name", "Name"],
+        "Status": ["Manager", "Employee"]
+    }
+
+    shift_data = {
+        "Shift": ["Morning", "Mid", "Night"],
+        "Start": ["08:00", "16:00", "00:00"],
+        "End": ["16:00", "00:00", "08:00"],
+        "Min Employees": [1, 1, 1]
+    }
+
+    # Create an in-memory stream for the Excel file
+    excel_stream = BytesIO()
+
+    # Excel writer using XlsxWriter
+    with pd.ExcelWriter(excel_stream, engine="xlsxwriter") as excel_writer:
+        # Write each DataFrame to a different sheet
+        pd.DataFrame(employee_data).to_excel(excel_writer, sheet_name="Employee Information", index=False)
+        pd.DataFrame(shift_data).to_excel(excel_writer, sheet_name="Shift Information", index=False)
+        pd.DataFrame(settings['day_data']).to_excel(excel_writer, sheet_name="Day Information", index=False)
+        pd.DataFrame(settings['off_days_data']).to_excel(excel_writer, sheet_name="Off Days", index=False)
+        pd.DataFrame(settings['general_data']).to_excel(excel_writer, sheet_name="General Information", index=False)
+
+    # Set content type and provide download link
+    excel_stream.seek(0)
+    if 'file_path' not in ss:
+        st.download_button(label="Download Template Excel File", data=excel_stream, file_name=settings['template_file_name'], mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+
+# Dropdown menu for business type selection
+business_type = st.selectbox('Select Business Type:', list(BUSINESS_TYPES))
+
+main(business_type)